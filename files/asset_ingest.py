@@ -0,0 +1,93 @@
+"""Normalize uploaded photos and signatures into card-sized assets"""
+import hashlib
+import os
+from PIL import Image
+from image_cache import load_thumbnail
+
+ASSET_DIR = "assets"
+
+# Canonical on-card sizes; print variants are rendered at PRINT_SCALE times these
+ASSET_KINDS = {
+    "photo": {"size": (150, 150), "format": "JPEG", "extension": ".jpg"},
+    "sign": {"size": (100, 50), "format": "PNG", "extension": ".png"},
+}
+PRINT_SCALE = 4
+PRINT_SUFFIX = "@print"
+
+# Image columns of the id table and the asset kind stored in each
+COLUMN_KINDS = {
+    "std_img": "photo",
+    "std_sign": "sign",
+    "p_sign": "sign",
+}
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_managed(path):
+    """Whether a path already points into the managed asset directory"""
+    if not path:
+        return False
+    asset_root = os.path.abspath(ASSET_DIR)
+    try:
+        return os.path.commonpath([asset_root, os.path.abspath(path)]) == asset_root
+    except ValueError:
+        # Paths on different drives
+        return False
+
+
+def asset_paths(kind, content_hash):
+    """Card-size and print-size paths for an asset"""
+    spec = ASSET_KINDS[kind]
+    base = os.path.join(ASSET_DIR, kind, content_hash)
+    return base + spec["extension"], base + PRINT_SUFFIX + spec["extension"]
+
+
+def print_variant(path):
+    """Print-resolution counterpart of a managed asset path, if it exists"""
+    base, extension = os.path.splitext(path)
+    candidate = base + PRINT_SUFFIX + extension
+    return candidate if os.path.exists(candidate) else None
+
+
+def _save_atomic(image, path, fmt):
+    partial_path = path + ".part"
+    options = {"quality": 92, "optimize": True} if fmt == "JPEG" else {"optimize": True}
+    image.save(partial_path, format=fmt, **options)
+    os.replace(partial_path, path)
+
+
+def ingest_image(source_path, kind):
+    """Store card-size and print-size derivatives of an uploaded image.
+
+    Returns (card_path, content_hash). Files are named by the hash of the
+    original upload, so ingesting the same file twice is a cheap no-op.
+    """
+    if is_managed(source_path):
+        name = os.path.splitext(os.path.basename(source_path))[0]
+        return source_path, name
+
+    spec = ASSET_KINDS[kind]
+    content_hash = file_hash(source_path)
+    card_path, print_path = asset_paths(kind, content_hash)
+    if os.path.exists(card_path) and os.path.exists(print_path):
+        return card_path, content_hash
+
+    os.makedirs(os.path.dirname(card_path), exist_ok=True)
+    width, height = spec["size"]
+    # Decode once at print size and derive the card size from it; only the
+    # variants that are missing are written
+    print_image = load_thumbnail(source_path, (width * PRINT_SCALE, height * PRINT_SCALE))
+    if not os.path.exists(print_path):
+        _save_atomic(print_image, print_path, spec["format"])
+    if not os.path.exists(card_path):
+        _save_atomic(print_image.resize(spec["size"], Image.LANCZOS), card_path, spec["format"])
+    return card_path, content_hash
+
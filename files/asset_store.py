@@ -0,0 +1,133 @@
+"""Content-addressed, reference-counted store for card photos and signatures"""
+import logging
+import os
+from asset_ingest import COLUMN_KINDS, asset_paths, ingest_image, is_managed, print_variant
+
+IMAGE_COLUMNS = ("std_img", "std_sign", "p_sign")
+
+def prepare(source_path, kind, missing_ok=False):
+    """Ingest an image ahead of the transaction that will reference it.
+
+    Decoding, resizing and writing happen here, outside SQLite's write lock;
+    acquire_prepared() then only has to upsert the reference. Returns
+    (source_path, kind, stored_path, hash); hash is None for a missing file
+    passed through with missing_ok.
+    """
+    if missing_ok and not (source_path and os.path.exists(source_path)):
+        return source_path, kind, source_path, None
+    path, content_hash = ingest_image(source_path, kind)
+    return source_path, kind, path, content_hash
+
+
+def acquire_prepared(cursor, prepared):
+    """Take a reference to a prepared image; returns the stored path.
+
+    Runs inside the caller's transaction so the reference and the row that
+    uses it are committed together.
+    """
+    source_path, kind, path, content_hash = prepared
+    if content_hash is None:
+        return path
+
+    cursor.execute("""
+        INSERT INTO assets (hash, kind, path, refcount) VALUES (?, ?, ?, 1)
+        ON CONFLICT(hash, kind) DO UPDATE SET refcount = refcount + 1
+    """, (content_hash, kind, path))
+    # collect_garbage() at another desk may have removed the files between
+    # ingest_image() and our reference; now that we hold one, write any missing
+    # variant again (the card and @print files are checked separately)
+    if not is_managed(source_path) and not all(
+            os.path.exists(p) for p in asset_paths(kind, content_hash)):
+        path, _ = ingest_image(source_path, kind)
+    return path
+
+
+def acquire(cursor, source_path, kind, missing_ok=False):
+    """Ingest an image (if needed) and take a reference to it; returns the stored path"""
+    return acquire_prepared(cursor, prepare(source_path, kind, missing_ok))
+
+
+def release(cursor, path):
+    """Drop one reference to a stored asset (unmanaged paths are ignored)"""
+    if not is_managed(path):
+        return
+    cursor.execute("""
+        UPDATE assets SET refcount = refcount - 1
+        WHERE path=? AND refcount > 0
+    """, (path,))
+
+
+def prepare_record_images(paths, missing_ok=False):
+    """prepare() the (std_img, std_sign, p_sign) images of a record"""
+    return tuple(prepare(path, COLUMN_KINDS[column], missing_ok=missing_ok)
+                 for column, path in zip(IMAGE_COLUMNS, paths))
+
+
+def acquire_record_images(cursor, prepared_images):
+    """Take references for a record's prepare_record_images(); returns the stored paths"""
+    return tuple(acquire_prepared(cursor, prepared) for prepared in prepared_images)
+
+
+def replace_record_images(cursor, old_paths, prepared_images):
+    """Move a record's references from old_paths to the prepared images; returns the stored paths"""
+    stored = acquire_record_images(cursor, prepared_images)
+    for path in old_paths:
+        release(cursor, path)
+    return stored
+
+
+def discard(connection, prepared_images):
+    """Remove files prepared for rows that were rolled back, unless something references them.
+
+    Call after the rollback. Like collect_garbage() this holds the write lock
+    while it checks and removes, so a concurrent reference is never lost.
+    """
+    candidates = {(kind, path, content_hash) for source_path, kind, path, content_hash
+                  in prepared_images if content_hash is not None and not is_managed(source_path)}
+    if not candidates:
+        return
+    cursor = connection.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        orphans = [path for kind, path, content_hash in candidates
+                   if cursor.execute("SELECT 1 FROM assets WHERE hash=? AND kind=?",
+                                     (content_hash, kind)).fetchone() is None]
+        _remove_files(orphans)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def collect_garbage(connection):
+    """Delete unreferenced assets and their files; call after the owning commit.
+
+    The rows are selected, deleted and their files removed under one write
+    lock, so another desk cannot take a new reference to an asset in between.
+    """
+    cursor = connection.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("SELECT path FROM assets WHERE refcount <= 0")
+        paths = [row[0] for row in cursor.fetchall()]
+        if paths:
+            cursor.execute("DELETE FROM assets WHERE refcount <= 0")
+            _remove_files(paths)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return len(paths)
+
+
+def _remove_files(paths):
+    for path in paths:
+        for file_path in (print_variant(path), path):
+            if not file_path:
+                continue
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Could not remove unreferenced asset {file_path}: {e}")
@@ -0,0 +1,328 @@
+"""Benchmarks for the database, image and rendering hot paths on synthetic data"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from PIL import Image, ImageDraw
+import PIL
+import db
+import records
+import repository
+from migrations import migrate
+from image_cache import ImageCache, load_thumbnail
+from card_renderer import render_card_bytes
+from print_export import export_pdf
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Photos as they arrive from webcams, scanners and phones
+PHOTO_SIZES = [(480, 640), (1200, 1600), (3024, 4032)]
+SIGN_SIZES = [(400, 200), (1200, 600)]
+
+FIRST_NAMES = ("Aarav Aditi Akash Ananya Arjun Diya Ishaan Kavya Kiran Meera Neha Nikhil "
+               "Pooja Priya Rahul Riya Rohan Sagar Sneha Tanvi Varun Vikram Yash Zoya").split()
+LAST_NAMES = ("Bhosale Chavan Deshmukh Gaikwad Gupta Iyer Jadhav Joshi Kamble Kulkarni "
+              "Mehta Nair Patil Pawar Rao Reddy Shah Sharma Shinde More").split()
+STANDARDS = ("FY.BSC IT", "FY.BSC CS", "SY.BSC IT", "SY.BSC CS", "TY.BSC IT", "TY.BSC CS")
+YEARS = ("2020-21", "2021-22", "2022-23", "2023-24", "2024-25")
+CLASS_SIZE = 60
+# Bump when synthetic_rows changes so cached datasets are regenerated
+DATASET_VERSION = 2
+
+
+def make_photo(path, size, seed):
+    """A JPEG with enough structure that decoding costs what a real photo does"""
+    rng = random.Random(seed)
+    image = Image.merge("RGB", [Image.linear_gradient("L").rotate(rng.randint(0, 359)).resize(size)
+                                for _ in range(3)])
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        r = rng.randint(size[0] // 40, size[0] // 6)
+        draw.ellipse([x - r, y - r, x + r, y + r],
+                     fill=tuple(rng.randrange(256) for _ in range(3)))
+    image.save(path, "JPEG", quality=90)
+
+
+def make_signature(path, size, seed):
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, "#ffffff")
+    draw = ImageDraw.Draw(image)
+    points = [(rng.randrange(size[0]), rng.randrange(size[1])) for _ in range(30)]
+    draw.line(points, fill="#000000", width=max(2, size[0] // 200))
+    image.save(path, "PNG")
+
+
+def generate_images(image_dir, count=12, seed=0):
+    """Photo and signature files of varying sizes; returns (photos, signatures)"""
+    os.makedirs(image_dir, exist_ok=True)
+    photos, signatures = [], []
+    for i in range(count):
+        photo = os.path.join(image_dir, f"photo_{i:03d}.jpg")
+        sign = os.path.join(image_dir, f"sign_{i:03d}.png")
+        if not os.path.exists(photo):
+            make_photo(photo, PHOTO_SIZES[i % len(PHOTO_SIZES)], seed + i)
+        if not os.path.exists(sign):
+            make_signature(sign, SIGN_SIZES[i % len(SIGN_SIZES)], seed + i)
+        photos.append(photo)
+        signatures.append(sign)
+    return photos, signatures
+
+
+def division_name(index):
+    """A, B, ..., Z, AA, AB, ... for the index-th division of a standard"""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord("A") + remainder) + name
+    return name
+
+
+def synthetic_rows(count, photos, signatures, seed=0):
+    """id table rows spread over a few academic years with many classes each.
+
+    Students are split evenly across YEARS, then into classes of CLASS_SIZE
+    cycling through STANDARDS (with as many divisions as that takes). Roll
+    numbers run on through the year so (yr, rollno) stays unique, as the
+    unique index requires.
+    """
+    rng = random.Random(seed)
+    principal = signatures[0]
+    per_year = -(-count // len(YEARS))
+    for i in range(count):
+        year_index, position = divmod(i, per_year)
+        class_index = position // CLASS_SIZE
+        standard_index, division_index = (class_index % len(STANDARDS),
+                                          class_index // len(STANDARDS))
+        yield (STANDARDS[standard_index], division_name(division_index),
+               f"{rng.randint(1995, 2008)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+               position + 1, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+               YEARS[year_index], photos[i % len(photos)], signatures[i % len(signatures)],
+               principal)
+
+
+def generate_dataset(path, count, photos, signatures, seed=0):
+    """Create (or reuse) a sqlite.db-style database with count synthetic students"""
+    if os.path.exists(path):
+        connection = db.connect(path)
+        try:
+            if connection.execute("SELECT COUNT(*) FROM id").fetchone()[0] == count:
+                migrate(connection)
+                return
+        except sqlite3.Error:
+            pass
+        finally:
+            connection.close()
+        os.remove(path)
+
+    connection = db.connect(path)
+    try:
+        migrate(connection)
+        connection.executemany("""
+            INSERT INTO id (standard, division, dob, rollno, nm, yr, std_img, std_sign, p_sign)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, synthetic_rows(count, photos, signatures, seed))
+        connection.commit()
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+
+
+def measure(func, repeat):
+    """Run func repeat times; returns timing statistics in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(durations[0], 4),
+        "median_ms": round(statistics.median(durations), 4),
+        "p95_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 4),
+    }
+
+
+def bench_database(connection, repeat, rng):
+    """Name listing, record fetch and duplicate roll number checks"""
+    max_id = connection.execute("SELECT MAX(id) FROM id").fetchone()[0]
+    sample = connection.execute("SELECT yr, rollno, nm FROM id WHERE id=?",
+                                (max_id // 2,)).fetchone()
+    cursor = connection.cursor()
+    duplicate = {"standard": "X", "division": "A", "dob": "2000-01-01",
+                 "rollno": sample[1], "nm": "Dup", "yr": sample[0]}
+
+    def duplicate_insert():
+        # The insert path relies on the unique (yr, rollno) index to reject duplicates
+        try:
+            repository.insert_student(cursor, duplicate, ("", "", ""))
+        except repository.DuplicateRollNumber:
+            pass
+        connection.rollback()
+
+    return {
+        # The old dropdowns loaded every name up front
+        "name_listing_all": measure(
+            lambda: connection.execute("SELECT nm FROM id ORDER BY nm").fetchall(),
+            max(1, repeat // 10)),
+        "name_search_prefix": measure(
+            lambda: records.search_students(connection, sample[2][:3]), repeat),
+        "record_fetch_by_id": measure(
+            lambda: records.get_record(connection, rng.randint(1, max_id)), repeat),
+        "record_fetch_by_name": measure(
+            lambda: connection.execute("SELECT * FROM id WHERE nm=?", (sample[2],)).fetchone(),
+            repeat),
+        "duplicate_roll_select": measure(
+            lambda: connection.execute("SELECT 1 FROM id WHERE yr=? AND rollno=?",
+                                       (sample[0], sample[1])).fetchone(), repeat),
+        "duplicate_roll_insert": measure(duplicate_insert, repeat),
+    }
+
+
+def bench_images(photos, signatures, repeat):
+    """Decode + resize to the on-screen card sizes, cold and from the cache"""
+    results = {}
+    for photo in photos[:len(PHOTO_SIZES)]:
+        with Image.open(photo) as image:
+            width, height = image.size
+        results[f"photo_resize_{width}x{height}"] = measure(
+            lambda: load_thumbnail(photo, (150, 150)), repeat)
+    results["signature_resize"] = measure(
+        lambda: load_thumbnail(signatures[-1], (100, 50)), repeat)
+
+    cache = ImageCache()
+    cache.get(photos[-1], (150, 150))
+    results["photo_cache_hit"] = measure(lambda: cache.get(photos[-1], (150, 150)), repeat)
+    return results
+
+
+def bench_render(connection, repeat, export_cards):
+    """Single card render and a multi-card PDF export"""
+    rows = connection.execute("SELECT * FROM id ORDER BY id LIMIT ?", (export_cards,)).fetchall()
+    results = {
+        "card_render_png": measure(lambda: render_card_bytes(rows[0], "PNG"), repeat),
+        "card_render_jpeg_300dpi": measure(
+            lambda: render_card_bytes(rows[0], "JPEG", scale=300 / 254), max(1, repeat // 5)),
+    }
+
+    summaries = []
+    with tempfile.TemporaryDirectory() as tmp:
+        export = measure(
+            lambda: summaries.append(export_pdf(rows, os.path.join(tmp, "bench.pdf"))),
+            max(1, repeat // 5))
+    # Peak RSS is a process-wide high-water mark, so the last run's value covers all
+    summary = summaries[-1]
+    export.update({
+        "cards": summary["cards"],
+        "cards_per_second": round(summary["cards"] / (export["median_ms"] / 1000), 2),
+        "peak_rss_mb": summary["peak_rss_mb"],
+    })
+    results["pdf_export"] = export
+    return results
+
+
+def run_benchmarks(sizes, workdir, repeat=50, export_cards=60, seed=0):
+    photos, signatures = generate_images(os.path.join(workdir, "images"), seed=seed)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "images": bench_images(photos, signatures, max(1, repeat // 5)),
+        "datasets": {},
+    }
+
+    for count in sizes:
+        path = os.path.join(workdir, f"bench_{count}_v{DATASET_VERSION}.db")
+        start = time.perf_counter()
+        generate_dataset(path, count, photos, signatures, seed)
+        print(f"Dataset {count} rows ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        connection = db.connect(path)
+        connection.row_factory = sqlite3.Row
+        try:
+            rng = random.Random(seed)
+            results = bench_database(connection, repeat, rng)
+            if count == sizes[0]:
+                # Rendering does not depend on table size; measure it once
+                results.update(bench_render(connection, max(1, repeat // 5), export_cards))
+            report["datasets"][str(count)] = results
+        finally:
+            connection.close()
+    return report
+
+
+def sections(report):
+    """{label: {benchmark: stats}} for every part of a report with timings"""
+    found = {"images": report.get("images", {})}
+    for count, results in report.get("datasets", {}).items():
+        found[f"{count} rows"] = results
+    return found
+
+
+def compare(report, baseline, tolerance):
+    """List benchmarks whose median got slower than baseline by more than tolerance"""
+    regressions = []
+    old_sections = sections(baseline)
+    for label, results in sections(report).items():
+        old_results = old_sections.get(label, {})
+        for name, stats in results.items():
+            old = old_results.get(name, {}).get("median_ms")
+            new = stats.get("median_ms")
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{label} {name}: {old:.3f}ms -> {new:.3f}ms")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark database, image and rendering paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Dataset sizes to generate and measure")
+    parser.add_argument("--workdir", default="benchmark_data",
+                        help="Where synthetic databases and images are kept between runs")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per measurement")
+    parser.add_argument("--export-cards", type=int, default=60,
+                        help="Cards in the PDF export measurement")
+    parser.add_argument("--out", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare medians against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown versus the baseline (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmarks(sorted(args.rows), args.workdir, args.repeat, args.export_cards)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.out}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Session-wide branding assets: college name, logo, card header banner and fonts"""
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+
+# PIL is imported inside the functions that need it, so the main menu can
+# read the branding settings without paying for the import.
+
+BRANDING_FILE = "branding.json"
+DEFAULT_BRANDING = {
+    "college_name": "COLLEGE NAME",
+    "logo": "logo_college.jpg",
+    "header_color": "#1a237e",
+    "header_text_color": "#ffffff",
+}
+
+FONT_CANDIDATES = {
+    False: ["arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf"],
+    True: ["arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf"],
+}
+
+
+def load_branding(path=BRANDING_FILE):
+    """Branding settings from path, with defaults for anything not set there"""
+    branding = dict(DEFAULT_BRANDING)
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                branding.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable branding file {path}: {e}")
+    return branding
+
+
+@lru_cache(maxsize=32)
+def load_font(size, bold=False):
+    """Load a TrueType font, falling back to PIL's built-in font"""
+    from PIL import ImageFont
+
+    for name in FONT_CANDIDATES[bold]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 has no sized default font
+        return ImageFont.load_default()
+
+
+class AssetRegistry:
+    """Logo and header banner decoded once per session and shared by all screens.
+
+    PIL images are cached by size and may be used from any thread (the print
+    and bulk renderers use them from workers); they must not be modified in
+    place. Tk PhotoImages are cached separately and must only be requested
+    from the Tk thread.
+    """
+
+    def __init__(self, branding=None):
+        self.branding = branding or load_branding()
+        self._images = {}
+        self._photos = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key, build):
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = build()
+            return self._images[key]
+
+    def logo(self, size):
+        """The college logo resized to size, or None if the file is missing"""
+        def build():
+            from PIL import Image
+
+            path = self.branding["logo"]
+            if not os.path.exists(path):
+                return None
+            with Image.open(path) as image:
+                return image.convert("RGB").resize(size, Image.LANCZOS)
+        return self._cached(("logo", size), build)
+
+    def header_banner(self, size):
+        """Card header strip with the college name centered on it"""
+        def build():
+            from PIL import Image, ImageDraw
+
+            width, height = size
+            banner = Image.new("RGB", size, self.branding["header_color"])
+            draw = ImageDraw.Draw(banner)
+            text = self.branding["college_name"]
+            font = load_font(height // 2, bold=True)
+            left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+            draw.text(((width - (right - left)) / 2 - left, (height - (bottom - top)) / 2 - top),
+                      text, font=font, fill=self.branding["header_text_color"])
+            return banner
+        return self._cached(("header", size), build)
+
+    def photo(self, name, size):
+        """Tk PhotoImage form of logo() or header_banner(); None if unavailable"""
+        key = (name, size)
+        if key not in self._photos:
+            from PIL import ImageTk
+
+            image = self.logo(size) if name == "logo" else self.header_banner(size)
+            self._photos[key] = ImageTk.PhotoImage(image) if image is not None else None
+        return self._photos[key]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The session's AssetRegistry, created on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AssetRegistry()
+        return _registry
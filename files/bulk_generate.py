@@ -0,0 +1,155 @@
+"""Bulk ID card generation from the id table using a process pool"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from card_renderer import save_card
+from image_cache import set_cache_limit
+import db
+
+
+def build_query(year=None, standard=None, division=None):
+    """SELECT over the id table for the given filters, in class order"""
+    conditions = []
+    params = []
+    for column, value in (("yr", year), ("standard", standard), ("division", division)):
+        if value:
+            conditions.append(f"{column}=?")
+            params.append(value)
+
+    query = "SELECT * FROM id"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY yr, standard, division, rollno"
+    return query, params
+
+
+def select_rows(db_path, year=None, standard=None, division=None):
+    """Fetch id table rows matching the given filters"""
+    query, params = build_query(year, standard, division)
+    conn = db.connect(db_path)
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+
+def card_filename(row, fmt):
+    """Stable output file name for a row so interrupted runs can resume"""
+    extension = "jpg" if fmt == "JPEG" else "png"
+    return f"card_{row[0]:06d}.{extension}"
+
+
+def render_to_file(task):
+    """Render one card into place atomically (runs in a worker process)"""
+    row, path, fmt, scale = task
+    base, extension = os.path.splitext(path)
+    partial_path = f"{base}.part{extension}"
+    try:
+        # A card missing its photo or a signature counts as failed, not rendered,
+        # so a resumed run renders it again
+        save_card(row, partial_path, scale=scale, format=fmt, strict=True)
+        os.replace(partial_path, path)
+        return path, None
+    except Exception as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        return path, str(e)
+
+
+def generate_cards(rows, out_dir, workers=None, fmt="PNG", scale=1.0,
+                   force=False, chunksize=8, progress_every=100, cache_mb=None):
+    """Render every row to out_dir, skipping cards already written by a previous run"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    tasks = []
+    skipped = 0
+    for row in rows:
+        path = os.path.join(out_dir, card_filename(row, fmt))
+        if not force and os.path.exists(path):
+            skipped += 1
+            continue
+        tasks.append((row, path, fmt, scale))
+
+    rendered = 0
+    failures = []
+    start = time.perf_counter()
+    interrupted = False
+
+    if tasks:
+        # Each worker keeps its own decoded-image cache for shared signatures
+        initializer = set_cache_limit if cache_mb is not None else None
+        initargs = (cache_mb,) if cache_mb is not None else ()
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=initializer, initargs=initargs)
+        try:
+            for path, error in executor.map(render_to_file, tasks, chunksize=chunksize):
+                if error:
+                    failures.append((path, error))
+                else:
+                    rendered += 1
+                # Count failures too, so a failure can't repeat the previous line
+                completed = rendered + len(failures)
+                if progress_every and completed % progress_every == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"  {completed}/{len(tasks)} cards, {len(failures)} failed "
+                          f"({completed / elapsed:.1f} cards/sec)")
+        except KeyboardInterrupt:
+            interrupted = True
+            executor.shutdown(wait=False, cancel_futures=True)
+        finally:
+            executor.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "total": len(rows),
+        "rendered": rendered,
+        "skipped": skipped,
+        "failed": failures,
+        "seconds": elapsed,
+        "cards_per_sec": rendered / elapsed if elapsed > 0 else 0.0,
+        "interrupted": interrupted
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render ID cards for students in the database")
+    parser.add_argument("--db", default="sqlite.db", help="Path to the SQLite database")
+    parser.add_argument("--year", help="Academic year, e.g. 2023-24")
+    parser.add_argument("--standard", help="Standard, e.g. 'FY.BSC IT'")
+    parser.add_argument("--division", help="Division, e.g. A")
+    parser.add_argument("--out", default="cards", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--format", choices=["png", "jpeg"], default="png")
+    parser.add_argument("--scale", type=float, default=1.0, help="Render scale factor")
+    parser.add_argument("--cache-mb", type=float, default=None,
+                        help="Decoded image cache size per worker in MB")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render cards that already exist in the output directory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rows = select_rows(args.db, args.year, args.standard, args.division)
+    print(f"Found {len(rows)} matching records")
+
+    summary = generate_cards(rows, args.out, workers=args.workers,
+                             fmt=args.format.upper(), scale=args.scale, force=args.force,
+                             cache_mb=args.cache_mb)
+
+    print(f"Rendered {summary['rendered']} cards in {summary['seconds']:.2f}s "
+          f"({summary['cards_per_sec']:.1f} cards/sec), "
+          f"skipped {summary['skipped']} already generated")
+    for path, error in summary["failed"]:
+        print(f"  Failed {path}: {error}")
+    if summary["interrupted"]:
+        print("Interrupted - run the same command again to resume")
+        return 130
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
 import sqlite3
-import re
 import os
 from common_styles import COLORS, STYLES
+from image_loader import AsyncImageLoader
+from card_view import CardView
+import metrics
+import validation
+import repository
+import profiling
+from db import get_connection
+import asset_store
 
 class ImageDisplayApp:
     def __init__(self, root, parent=None):
@@ -15,6 +21,7 @@ class ImageDisplayApp:
         self.dob = ""
         self.roll = 0
         self.info_window = None
+        self.card_view = None
         self.has_unsaved_changes = False
         
         if not self.check_database_connection():
@@ -26,6 +33,11 @@ class ImageDisplayApp:
         self.root.title("Image Display App")
         self.root.attributes('-fullscreen', True)
         self.root.configure(bg=COLORS["light"])
+
+        # Decodes preview images off the Tk thread
+        self.image_loader = AsyncImageLoader(self.root)
+        # Closing the window goes back the same way, stopping the loader
+        self.root.protocol("WM_DELETE_WINDOW", self.go_back)
         
         # Create main container
         self.main_container = tk.Frame(self.root, bg=COLORS["light"])
@@ -62,21 +74,16 @@ class ImageDisplayApp:
 
     def go_back(self):
         if self.has_unsaved_changes:
-            if messagebox.askyesno("Confirm", "You have unsaved changes. Are you sure you want to go back?"):
-                self.root.destroy()
-                if self.parent:
-                    self.parent.deiconify()
-        else:
-            self.root.destroy()
-            if self.parent:
-                self.parent.deiconify()
+            if not messagebox.askyesno("Confirm", "You have unsaved changes. Are you sure you want to go back?"):
+                return
+        self.image_loader.shutdown()
+        self.root.destroy()
+        if self.parent:
+            self.parent.deiconify()
 
     def check_database_connection(self):
         try:
-            conn = sqlite3.connect('sqlite.db')
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            conn.close()
+            get_connection().execute("SELECT 1")
             return True
         except Exception as e:
             messagebox.showerror("Database Error", 
@@ -306,80 +313,53 @@ class ImageDisplayApp:
             status_label.config(text=os.path.basename(filename))
             self.has_unsaved_changes = True  # Mark changes when images are selected
 
-    def validate(self):
-        try:
-            # Get values from entry fields
-            name = self.name_entry.get()
-            division = self.division_entry.get()
-            standard = self.standard_entry.get()
-            academic_year = self.academic_year_entry.get()
-            dob = self.date_of_birth_entry.get()
-            roll_no = self.roll_number_entry.get()
-
-            # Handle placeholders
-            if name == "Enter name":
-                name = ""
-            if dob == "Enter date of birth":
-                dob = ""
-            if roll_no == "Enter roll number":
-                roll_no = ""
-
-            # Strip whitespace
-            name = name.strip()
-            division = division.strip()
-            standard = standard.strip()
-            academic_year = academic_year.strip()
-            dob = dob.strip()
-            roll_no = roll_no.strip()
-
-            # Check for empty fields
-            empty_fields = []
-            if not name:
-                empty_fields.append("Name")
-            if not division:
-                empty_fields.append("Division")
-            if not standard:
-                empty_fields.append("Standard")
-            if not academic_year:
-                empty_fields.append("Academic Year")
-            if not dob:
-                empty_fields.append("Date of Birth")
-            if not roll_no:
-                empty_fields.append("Roll Number")
-
-            if empty_fields:
-                messagebox.showerror('Error', f'Following fields are empty: {", ".join(empty_fields)}')
-                return False
+    def read_form(self):
+        """Validate the entry fields into self.name etc.; False after showing the error"""
+        record = {
+            "nm": self.name_entry.get(),
+            "division": self.division_entry.get(),
+            "standard": self.standard_entry.get(),
+            "yr": self.academic_year_entry.get(),
+            "dob": self.date_of_birth_entry.get(),
+            "rollno": self.roll_number_entry.get(),
+        }
+
+        # Handle placeholders
+        for field, placeholder in (("nm", "Enter name"), ("dob", "Enter date of birth"),
+                                   ("rollno", "Enter roll number")):
+            if record[field] == placeholder:
+                record[field] = ""
+
+        values, errors = validation.validate_record(record)
+        if errors:
+            messagebox.showerror('Error', validation.describe(errors))
+            return False
 
-            # Store validated values
-            self.name = name
-            self.div = division
-            self.std = standard
-            self.yr = academic_year
-            self.dob = dob
-            self.roll = int(roll_no)
-
-            # Additional validations
-            if not self.validate_name():
-                messagebox.showerror('Error', 'Name should contain only letters and spaces')
-                return False
+        # Store validated values
+        self.values = values
+        self.name = values["nm"]
+        self.div = values["division"]
+        self.std = values["standard"]
+        self.yr = values["yr"]
+        self.dob = values["dob"]
+        self.roll = values["rollno"]
+        return True
+
+    def check_images(self):
+        """Check if all images are selected"""
+        if all(self.selected_image_paths):
+            return True
 
-            if not self.dob_validate():
-                messagebox.showerror('Error', 'Date must be in YYYY-MM-DD format')
-                return False
+        captions = ("Student Photo", "Student Signature", "Principal Signature")
+        missing_images = [caption for caption, path in zip(captions, self.selected_image_paths)
+                          if not path]
+        messagebox.showerror('ALERT',
+            f'Please select all required images. Missing: {", ".join(missing_images)}')
+        return False
 
-            # Check if all images are selected
-            if not all(self.selected_image_paths):
-                missing_images = []
-                if not self.selected_image_paths[0]:
-                    missing_images.append("Student Photo")
-                if not self.selected_image_paths[1]:
-                    missing_images.append("Student Signature")
-                if not self.selected_image_paths[2]:
-                    missing_images.append("Principal Signature")
-                
-                messagebox.showerror('ALERT', 
-                    f'Please select all required images. Missing: {", ".join(missing_images)}')
+    def validate(self):
+        try:
+            if not self.read_form() or not self.check_images():
                 return False
 
             # If all validations pass, display the preview
@@ -391,12 +371,6 @@ class ImageDisplayApp:
             messagebox.showerror('Error', f'Validation error: {str(e)}')
             return False
 
-    def validate_name(self):
-        return all(char.isalpha() or char.isspace() for char in self.name)
-
-    def dob_validate(self):
-        return bool(re.match(r'^\d{4}-\d{2}-\d{2}$', self.dob))
-
     def clear_form(self):
         # Clear entry fields and set placeholders
         self.name_entry.delete(0, "end")
@@ -425,288 +399,119 @@ class ImageDisplayApp:
             status_label.config(text="No file selected")
         self.has_unsaved_changes = False  # Reset flag after clearing
 
+    @profiling.operation("save")
     def store(self):
         try:
-            # Get values from entry fields
-            name = self.name_entry.get()
-            division = self.division_entry.get()
-            standard = self.standard_entry.get()
-            academic_year = self.academic_year_entry.get()
-            dob = self.date_of_birth_entry.get()
-            roll_no = self.roll_number_entry.get()
-
-            # Handle placeholders
-            if name == "Enter name":
-                name = ""
-            if dob == "Enter date of birth":
-                dob = ""
-            if roll_no == "Enter roll number":
-                roll_no = ""
-
-            # Strip whitespace
-            name = name.strip()
-            division = division.strip()
-            standard = standard.strip()
-            academic_year = academic_year.strip()
-            dob = dob.strip()
-            roll_no = roll_no.strip()
-
-            # Check for empty fields
-            empty_fields = []
-            if not name:
-                empty_fields.append("Name")
-            if not division:
-                empty_fields.append("Division")
-            if not standard:
-                empty_fields.append("Standard")
-            if not academic_year:
-                empty_fields.append("Academic Year")
-            if not dob:
-                empty_fields.append("Date of Birth")
-            if not roll_no:
-                empty_fields.append("Roll Number")
-
-            if empty_fields:
-                messagebox.showerror('Error', f'Following fields are empty: {", ".join(empty_fields)}')
+            if not self.read_form() or not self.check_images():
                 return
 
-            # Validate roll number
+            # Store uploads as card-sized, deduplicated assets, before taking the write lock
             try:
-                roll_no = int(roll_no)
-                if not (1 <= roll_no <= 60):
-                    messagebox.showerror('Error', 'Roll number must be between 1 and 60')
-                    return
-            except ValueError:
-                messagebox.showerror('Error', 'Roll number must be numeric')
-                return
-
-            # Store validated values
-            self.name = name
-            self.div = division
-            self.std = standard
-            self.yr = academic_year
-            self.dob = dob
-            self.roll = roll_no
-
-            # Additional validations
-            if not self.validate_name():
-                messagebox.showerror('Error', 'Name should contain only letters and spaces')
-                return
-
-            if not self.dob_validate():
-                messagebox.showerror('Error', 'Date must be in YYYY-MM-DD format')
-                return
-
-            # Check if all images are selected
-            if not all(self.selected_image_paths):
-                missing_images = []
-                if not self.selected_image_paths[0]:
-                    missing_images.append("Student Photo")
-                if not self.selected_image_paths[1]:
-                    missing_images.append("Student Signature")
-                if not self.selected_image_paths[2]:
-                    missing_images.append("Principal Signature")
-                
-                messagebox.showerror('ALERT', 
-                    f'Please select all required images. Missing: {", ".join(missing_images)}')
+                with metrics.span("image.ingest"):
+                    prepared = asset_store.prepare_record_images(self.selected_image_paths)
+            except Exception as e:
+                print(f"Image Processing Error: {e}")
+                messagebox.showerror('Error', f'Failed to process images: {str(e)}')
                 return
 
-            # Connect to database
-            con = sqlite3.connect('sqlite.db')
+            # Shared database connection
+            con = get_connection()
             cursor = con.cursor()
 
             try:
-                # Check if roll number already exists
-                cursor.execute("""
-                    SELECT rollno FROM id 
-                    WHERE rollno=? AND yr=?
-                """, (self.roll, self.yr))
-                
-                existing = cursor.fetchone()
-                if existing:
-                    messagebox.showerror('Error', 
-                        f'Roll number {self.roll} already exists for academic year {self.yr}')
-                    return
-
-                # Insert data
-                cursor.execute("""
-                    INSERT INTO id (standard, division, dob, rollno, nm, yr, 
-                                  std_img, std_sign, p_sign) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (self.std, self.div, self.dob, self.roll, self.name, self.yr,
-                      self.selected_image_paths[0], self.selected_image_paths[1],
-                      self.selected_image_paths[2]))
-
-                con.commit()
+                image_paths = asset_store.acquire_record_images(cursor, prepared)
+
+                # Insert data; the unique (yr, rollno) index rejects duplicate roll numbers
+                repository.insert_student(cursor, self.values, image_paths)
+
+                with metrics.span("db.commit"):
+                    con.commit()
                 print("\nData saved successfully!")
                 messagebox.showinfo('SUCCESS', 'ID Card details saved successfully')
                 self.has_unsaved_changes = False  # Reset flag after saving
                 self.clear_form()
 
+            except repository.DuplicateRollNumber as e:
+                con.rollback()
+                asset_store.discard(con, prepared)
+                messagebox.showerror('Error', str(e))
             except sqlite3.Error as e:
+                con.rollback()
+                asset_store.discard(con, prepared)
                 print(f"Database Error: {e}")
                 messagebox.showerror('Database Error', f'Failed to save data: {str(e)}')
-            finally:
-                con.close()
 
         except Exception as e:
             print(f"Unexpected Error: {e}")
             messagebox.showerror('Error', f'An unexpected error occurred: {str(e)}')
 
+    @profiling.operation("preview")
+    @metrics.timed("ui.preview")
     def display_images(self):
         try:
-            # Create a new Toplevel window
-            self.info_window = tk.Toplevel(self.root)
-            self.info_window.title("ID Card Preview")
-            
-            # Configure window
-            window_width = 900
-            window_height = 600
-            screen_width = self.info_window.winfo_screenwidth()
-            screen_height = self.info_window.winfo_screenheight()
-            x = (screen_width - window_width) // 2
-            y = (screen_height - window_height) // 2
-            self.info_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
-            self.info_window.configure(bg="#ffffff")
-
-            # Main container with card-like appearance
-            container = tk.Frame(self.info_window, bg="#ffffff", padx=40, pady=30)
-            container.pack(expand=True, fill="both")
-
-            # Card frame with border and shadow effect
-            card_frame = tk.Frame(container,
-                                bg="#ffffff",
-                                relief="solid",
-                                bd=1)
-            card_frame.pack(expand=True, fill="both")
-
-            # Header with college name
-            header_frame = tk.Frame(card_frame, bg="#1a237e", height=60)
-            header_frame.pack(fill="x")
-            header_frame.pack_propagate(False)
-
-            tk.Label(header_frame,
-                    text="COLLEGE NAME",
-                    font=("Arial", 24, "bold"),
-                    fg="#ffffff",
-                    bg="#1a237e").pack(expand=True)
-
-            # Student information section
-            info_frame = tk.Frame(card_frame, bg="#ffffff", padx=30, pady=20)
-            info_frame.pack(fill="x")
-
-            # Two columns for information
-            left_frame = tk.Frame(info_frame, bg="#ffffff")
-            left_frame.pack(side="left", expand=True, fill="both")
-
-            right_frame = tk.Frame(info_frame, bg="#ffffff")
-            right_frame.pack(side="right", expand=True, fill="both")
-
-            # Student photo
-            try:
-                photo = Image.open(self.selected_image_paths[0])
-                photo = photo.resize((150, 150))
-                photo_image = ImageTk.PhotoImage(photo)
-                photo_label = tk.Label(right_frame, image=photo_image, bg="#ffffff")
-                photo_label.image = photo_image
-                photo_label.pack(pady=(0, 20))
-            except Exception as e:
-                print(f"Error loading student photo: {e}")
-
-            # Student information (left side)
-            info_fields = [
-                ("Name", self.name),
-                ("Standard", self.std),
-                ("Division", self.div),
-                ("Roll No", str(self.roll)),
-                ("Academic Year", self.yr),
-                ("Date of Birth", self.dob)
-            ]
-
-            for label, value in info_fields:
-                field_frame = tk.Frame(left_frame, bg="#ffffff")
-                field_frame.pack(fill="x", pady=5)
-
-                tk.Label(field_frame,
-                        text=f"{label}:",
-                        font=("Arial", 12, "bold"),
-                        bg="#ffffff").pack(side="left", padx=(0, 10))
-
-                tk.Label(field_frame,
-                        text=value,
-                        font=("Arial", 12),
-                        bg="#ffffff").pack(side="left")
-
-            # Signature section
-            signature_frame = tk.Frame(card_frame, bg="#ffffff", padx=30, pady=20)
-            signature_frame.pack(fill="x", side="bottom")
-
-            # Student signature
-            try:
-                student_sign = Image.open(self.selected_image_paths[1])
-                student_sign = student_sign.resize((100, 50))
-                student_sign_photo = ImageTk.PhotoImage(student_sign)
-                
-                sign_frame = tk.Frame(signature_frame, bg="#ffffff")
-                sign_frame.pack(side="left", expand=True)
-                
-                tk.Label(sign_frame,
-                        image=student_sign_photo,
-                        bg="#ffffff").pack()
-                sign_frame.image = student_sign_photo
-                
-                tk.Label(sign_frame,
-                        text="Student's Signature",
-                        font=("Arial", 10),
-                        bg="#ffffff").pack()
-            except Exception as e:
-                print(f"Error loading student signature: {e}")
-
-            # Principal signature
-            try:
-                principal_sign = Image.open(self.selected_image_paths[2])
-                principal_sign = principal_sign.resize((100, 50))
-                principal_sign_photo = ImageTk.PhotoImage(principal_sign)
-                
-                sign_frame = tk.Frame(signature_frame, bg="#ffffff")
-                sign_frame.pack(side="right", expand=True)
-                
-                tk.Label(sign_frame,
-                        image=principal_sign_photo,
-                        bg="#ffffff").pack()
-                sign_frame.image = principal_sign_photo
-                
-                tk.Label(sign_frame,
-                        text="Principal's Signature",
-                        font=("Arial", 10),
-                        bg="#ffffff").pack()
-            except Exception as e:
-                print(f"Error loading principal signature: {e}")
-
-            # Buttons frame
-            button_frame = tk.Frame(container, bg="#ffffff")
-            button_frame.pack(pady=(20, 0))
-
-            tk.Button(button_frame,
-                     text="Save ID Card",
-                     command=self.store,
-                     bg=COLORS["success"],
-                     fg="#ffffff",
-                     font=("Arial", 11),
-                     padx=20,
-                     pady=8,
-                     relief="flat").pack(side="left", padx=10)
-
-            tk.Button(button_frame,
-                     text="Cancel",
-                     command=self.info_window.destroy,
-                     bg=COLORS["danger"],
-                     fg="#ffffff",
-                     font=("Arial", 11),
-                     padx=20,
-                     pady=8,
-                     relief="flat").pack(side="left", padx=10)
+            if self.info_window is None or not self.info_window.winfo_exists():
+                self.build_preview_window()
+
+            self.card_view.show({
+                "nm": self.name, "standard": self.std, "division": self.div,
+                "rollno": self.roll, "yr": self.yr, "dob": self.dob,
+                "std_img": self.selected_image_paths[0],
+                "std_sign": self.selected_image_paths[1],
+                "p_sign": self.selected_image_paths[2]
+            })
+            self.info_window.deiconify()
+            self.info_window.lift()
 
         except Exception as e:
             print(f"Error in display_images: {e}")
-            messagebox.showerror("Error", f"Error displaying preview: {str(e)}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Error displaying preview: {str(e)}")
+
+    @metrics.timed("ui.build_preview_window")
+    def build_preview_window(self):
+        """Build the preview window once; display_images only updates its contents"""
+        self.info_window = tk.Toplevel(self.root)
+        self.info_window.title("ID Card Preview")
+        # Hide rather than destroy, so the widgets are reused for the next preview
+        self.info_window.protocol("WM_DELETE_WINDOW", self.info_window.withdraw)
+        
+        # Configure window
+        window_width = 900
+        window_height = 600
+        screen_width = self.info_window.winfo_screenwidth()
+        screen_height = self.info_window.winfo_screenheight()
+        x = (screen_width - window_width) // 2
+        y = (screen_height - window_height) // 2
+        self.info_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        self.info_window.configure(bg="#ffffff")
+
+        # Main container with card-like appearance
+        container = tk.Frame(self.info_window, bg="#ffffff", padx=40, pady=30)
+        container.pack(expand=True, fill="both")
+
+        # Card frame with border and shadow effect
+        self.card_view = CardView(container, self.image_loader)
+        self.card_view.pack(expand=True, fill="both")
+
+        # Buttons frame
+        button_frame = tk.Frame(container, bg="#ffffff")
+        button_frame.pack(pady=(20, 0))
+
+        tk.Button(button_frame,
+                 text="Save ID Card",
+                 command=self.store,
+                 bg=COLORS["success"],
+                 fg="#ffffff",
+                 font=("Arial", 11),
+                 padx=20,
+                 pady=8,
+                 relief="flat").pack(side="left", padx=10)
+
+        tk.Button(button_frame,
+                 text="Cancel",
+                 command=self.info_window.withdraw,
+                 bg=COLORS["danger"],
+                 fg="#ffffff",
+                 font=("Arial", 11),
+                 padx=20,
+                 pady=8,
+                 relief="flat").pack(side="left", padx=10)
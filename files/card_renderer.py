@@ -0,0 +1,133 @@
+"""Headless ID card rendering with PIL (no Tk required)"""
+import io
+import logging
+from PIL import Image, ImageDraw
+from image_cache import get_image
+from asset_ingest import print_variant
+from branding import get_registry, load_font
+
+# Column order of the id table
+COLUMNS = ("id", "standard", "division", "dob", "rollno",
+           "nm", "yr", "std_img", "std_sign", "p_sign")
+
+# Base card size in pixels (CR80 proportions at 10 px/mm)
+CARD_SIZE = (856, 540)
+
+HEADER_HEIGHT = 64
+PHOTO_SIZE = (150, 150)
+SIGN_SIZE = (100, 50)
+PLACEHOLDER_COLOR = "#f0f0f0"
+BORDER_COLOR = "#666666"
+
+
+def as_record(row):
+    """Return a mapping of column name to value for an id table row"""
+    if isinstance(row, (tuple, list)):
+        return dict(zip(COLUMNS, row))
+    return row
+
+
+def _paste_image(card, path, box, size, base_size, label, strict=False):
+    """Paste a resized image onto the card, drawing a placeholder on failure.
+
+    With strict=True a missing or unreadable image raises instead.
+    """
+    try:
+        if size[0] > base_size[0] and path:
+            # Scaled-up renders use the print-resolution asset when one exists
+            path = print_variant(path) or path
+        card.paste(get_image(path, size), box)
+    except Exception as e:
+        if strict:
+            raise RuntimeError(f"Error loading {label} {path}: {e}") from e
+        logging.warning(f"Error loading {label}: {e}")
+        draw = ImageDraw.Draw(card)
+        draw.rectangle([box[0], box[1], box[0] + size[0] - 1, box[1] + size[1] - 1],
+                       fill=PLACEHOLDER_COLOR)
+
+
+def _centered_text(draw, center_x, y, text, font, fill):
+    width = draw.textlength(text, font=font)
+    draw.text((center_x - width / 2, y), text, font=font, fill=fill)
+
+
+def render_card(row, scale=1.0, strict=False):
+    """Compose a full ID card for an id table row and return it as a PIL image.
+
+    Unreadable photos and signatures become grey boxes unless strict is set,
+    in which case they raise.
+    """
+    data = as_record(row)
+
+    def s(value):
+        return int(round(value * scale))
+
+    width, height = s(CARD_SIZE[0]), s(CARD_SIZE[1])
+    card = Image.new("RGB", (width, height), "#ffffff")
+    draw = ImageDraw.Draw(card)
+
+    # Header with college name, drawn once per size for the session
+    card.paste(get_registry().header_banner((width, s(HEADER_HEIGHT))), (0, 0))
+
+    # Student information (left side)
+    info_fields = [
+        ("Name", data["nm"]),
+        ("Standard", data["standard"]),
+        ("Division", data["division"]),
+        ("Roll No", str(data["rollno"])),
+        ("Academic Year", data["yr"]),
+        ("Date of Birth", data["dob"])
+    ]
+    label_font = load_font(s(17), bold=True)
+    value_font = load_font(s(17))
+    y = s(HEADER_HEIGHT + 26)
+    for label, value in info_fields:
+        label_text = f"{label}:"
+        draw.text((s(30), y), label_text, font=label_font, fill="#000000")
+        label_width = draw.textlength(label_text, font=label_font)
+        draw.text((s(30) + label_width + s(10), y), str(value), font=value_font, fill="#000000")
+        y += s(36)
+
+    # Student photo (right side)
+    photo_size = (s(PHOTO_SIZE[0]), s(PHOTO_SIZE[1]))
+    _paste_image(card, data["std_img"],
+                 (width - s(60) - photo_size[0], s(HEADER_HEIGHT + 26)),
+                 photo_size, PHOTO_SIZE, "student photo", strict)
+
+    # Signature section
+    sign_size = (s(SIGN_SIZE[0]), s(SIGN_SIZE[1]))
+    caption_font = load_font(s(14))
+    sign_y = height - s(30) - s(18) - sign_size[1]
+    signatures = [
+        (width / 4, data["std_sign"], "Student's Signature", "student signature"),
+        (width * 3 / 4, data["p_sign"], "Principal's Signature", "principal signature")
+    ]
+    for center_x, path, caption, label in signatures:
+        _paste_image(card, path, (int(center_x - sign_size[0] / 2), sign_y),
+                     sign_size, SIGN_SIZE, label, strict)
+        _centered_text(draw, center_x, sign_y + sign_size[1] + s(4), caption,
+                       caption_font, "#000000")
+
+    # Card border
+    draw.rectangle([0, 0, width - 1, height - 1], outline=BORDER_COLOR, width=max(1, s(1)))
+    return card
+
+
+def render_card_bytes(row, format="PNG", scale=1.0, strict=False, **save_options):
+    """Render a card and return the encoded image bytes (PNG or JPEG)"""
+    card = render_card(row, scale=scale, strict=strict)
+    if format.upper() in ("JPEG", "JPG"):
+        format = "JPEG"
+        save_options.setdefault("quality", 92)
+    buffer = io.BytesIO()
+    card.save(buffer, format=format, **save_options)
+    return buffer.getvalue()
+
+
+def save_card(row, path, scale=1.0, strict=False, **save_options):
+    """Render a card and write it to an image file"""
+    card = render_card(row, scale=scale, strict=strict)
+    if path.lower().endswith((".jpg", ".jpeg")):
+        save_options.setdefault("quality", 92)
+    card.save(path, **save_options)
+    return path
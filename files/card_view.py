@@ -0,0 +1,106 @@
+import tkinter as tk
+from branding import get_registry
+
+# (column, caption) for the text rows on the card
+INFO_FIELDS = (
+    ("nm", "Name"),
+    ("standard", "Standard"),
+    ("division", "Division"),
+    ("rollno", "Roll No"),
+    ("yr", "Academic Year"),
+    ("dob", "Date of Birth"),
+)
+
+# On-screen size of each image column
+IMAGE_SIZES = {"std_img": (150, 150), "std_sign": (100, 50), "p_sign": (100, 50)}
+
+
+class CardView(tk.Frame):
+    """On-screen ID card built once and updated in place for each record.
+
+    show() only reconfigures the existing labels and image slots, so moving
+    between records creates no widgets.
+    """
+
+    def __init__(self, parent, image_loader, **kwargs):
+        super().__init__(parent, bg="#ffffff", relief="solid", bd=1, **kwargs)
+        self.image_loader = image_loader
+        self.value_labels = {}
+        self.image_labels = {}
+
+        # Header with college name
+        branding = get_registry().branding
+        header_frame = tk.Frame(self, bg=branding["header_color"], height=60)
+        header_frame.pack(fill="x")
+        header_frame.pack_propagate(False)
+
+        # Logo decoded once per session, shared with the main menu
+        logo = get_registry().photo("logo", (48, 48))
+        if logo is not None:
+            logo_label = tk.Label(header_frame, image=logo, bg=branding["header_color"])
+            logo_label.image = logo
+            logo_label.place(x=10, rely=0.5, anchor="w")
+
+        tk.Label(header_frame,
+                text=branding["college_name"],
+                font=("Arial", 24, "bold"),
+                fg=branding["header_text_color"],
+                bg=branding["header_color"]).pack(expand=True)
+
+        # Student information section
+        info_frame = tk.Frame(self, bg="#ffffff", padx=30, pady=20)
+        info_frame.pack(fill="x")
+
+        # Two columns for information
+        left_frame = tk.Frame(info_frame, bg="#ffffff")
+        left_frame.pack(side="left", expand=True, fill="both")
+
+        right_frame = tk.Frame(info_frame, bg="#ffffff")
+        right_frame.pack(side="right", expand=True, fill="both")
+
+        # Student photo
+        self.image_labels["std_img"] = tk.Label(right_frame, bg="#ffffff")
+        self.image_labels["std_img"].pack(pady=(0, 20))
+
+        # Student information (left side)
+        for column, caption in INFO_FIELDS:
+            field_frame = tk.Frame(left_frame, bg="#ffffff")
+            field_frame.pack(fill="x", pady=5)
+
+            tk.Label(field_frame,
+                    text=f"{caption}:",
+                    font=("Arial", 12, "bold"),
+                    bg="#ffffff").pack(side="left", padx=(0, 10))
+
+            self.value_labels[column] = tk.Label(field_frame,
+                                                 font=("Arial", 12),
+                                                 bg="#ffffff")
+            self.value_labels[column].pack(side="left")
+
+        # Signature section
+        signature_frame = tk.Frame(self, bg="#ffffff", padx=30, pady=20)
+        signature_frame.pack(fill="x", side="bottom")
+
+        for side, column, caption in (("left", "std_sign", "Student's Signature"),
+                                      ("right", "p_sign", "Principal's Signature")):
+            sign_frame = tk.Frame(signature_frame, bg="#ffffff")
+            sign_frame.pack(side=side, expand=True)
+
+            self.image_labels[column] = tk.Label(sign_frame, bg="#ffffff")
+            self.image_labels[column].pack()
+
+            tk.Label(sign_frame,
+                    text=caption,
+                    font=("Arial", 10),
+                    bg="#ffffff").pack()
+
+    def show(self, record):
+        """Display record (any mapping with id table column names)"""
+        for column, label in self.value_labels.items():
+            label.configure(text=str(record[column]))
+        for column in self.image_labels:
+            self.set_image(column, record[column])
+
+    def set_image(self, column, path):
+        """Swap the picture in one image slot (placeholder until decoded)"""
+        self.image_loader.load_into(self.image_labels[column], path, IMAGE_SIZES[column])
@@ -0,0 +1,63 @@
+"""Shared SQLite connection management for all screens"""
+import logging
+import os
+import sqlite3
+import threading
+
+DB_PATH = 'sqlite.db'
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+
+
+def configure(connection):
+    """Apply the connection pragmas used throughout the application"""
+    # WAL lets readers at other desks proceed while one desk is writing
+    mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if mode.lower() != "wal":
+        logging.warning(f"WAL mode unavailable, using journal_mode={mode}")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    connection.execute("PRAGMA temp_store=MEMORY")
+    return connection
+
+
+def connect(path=None):
+    """Open a new configured connection (for worker processes and tools)"""
+    connection = sqlite3.connect(path or DB_PATH,
+                                 timeout=BUSY_TIMEOUT_MS / 1000,
+                                 cached_statements=STATEMENT_CACHE_SIZE)
+    return configure(connection)
+
+
+def get_connection():
+    """Return the shared connection for the current thread, opening it on first use.
+
+    Rows come back as sqlite3.Row so screens can use column names (row["nm"]).
+    """
+    connection = getattr(_local, "connection", None)
+    # A connection inherited across fork() or opened for another path is not reused
+    if connection is None or _local.pid != os.getpid() or _local.path != DB_PATH:
+        connection = connect()
+        connection.row_factory = sqlite3.Row
+        _local.connection = connection
+        _local.pid = os.getpid()
+        _local.path = DB_PATH
+    return connection
+
+
+def close_connection():
+    """Close the current thread's shared connection"""
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        if _local.pid == os.getpid():
+            connection.close()
+        _local.connection = None
+
+
+def set_database_path(path):
+    """Point the shared connection at a different database file"""
+    global DB_PATH
+    close_connection()
+    DB_PATH = path
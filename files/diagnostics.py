@@ -0,0 +1,82 @@
+import tkinter as tk
+from tkinter import ttk
+from common_styles import COLORS
+from image_cache import default_cache
+import metrics
+
+REFRESH_MS = 1000
+COLUMNS = (("count", "Count"), ("p50_ms", "p50 ms"), ("p95_ms", "p95 ms"),
+           ("max_ms", "Max ms"), ("total_ms", "Total ms"))
+
+
+class DiagnosticsPanel:
+    """Developer window listing the timing histograms collected by metrics"""
+
+    def __init__(self, parent):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Diagnostics")
+        self.window.geometry("760x480")
+        self.window.configure(bg=COLORS["light"])
+        self._refresh_id = None
+
+        controls = tk.Frame(self.window, bg=COLORS["light"], padx=10, pady=10)
+        controls.pack(fill="x")
+
+        self.enabled = tk.BooleanVar(value=metrics.enabled())
+        tk.Checkbutton(controls,
+                       text="Collect timings",
+                       variable=self.enabled,
+                       command=lambda: metrics.enable(self.enabled.get()),
+                       bg=COLORS["light"]).pack(side="left")
+
+        for text, command in (("Reset", self.reset), ("Write to log", metrics.log_summary)):
+            tk.Button(controls,
+                      text=text,
+                      command=command,
+                      bg=COLORS["primary"],
+                      fg=COLORS["light"],
+                      relief="flat",
+                      padx=10).pack(side="right", padx=5)
+
+        self.table = ttk.Treeview(self.window, columns=[c for c, _ in COLUMNS])
+        self.table.heading("#0", text="Operation")
+        self.table.column("#0", width=240)
+        for column, heading in COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=90, anchor="e")
+        self.table.pack(expand=True, fill="both", padx=10)
+
+        self.cache_label = tk.Label(self.window,
+                                    font=("Helvetica", 10),
+                                    fg=COLORS["text_gray"],
+                                    bg=COLORS["light"])
+        self.cache_label.pack(anchor="w", padx=10, pady=5)
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self):
+        self.table.delete(*self.table.get_children())
+        for name, stats in metrics.snapshot().items():
+            self.table.insert("", "end", text=name,
+                              values=[stats[column] for column, _ in COLUMNS])
+
+        cache = default_cache.stats()
+        self.cache_label.config(text="Image cache: " + ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in cache.items()))
+        self._refresh_id = self.window.after(REFRESH_MS, self.refresh)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh_now()
+
+    def refresh_now(self):
+        if self._refresh_id is not None:
+            self.window.after_cancel(self._refresh_id)
+        self.refresh()
+
+    def close(self):
+        if self._refresh_id is not None:
+            self.window.after_cancel(self._refresh_id)
+        self.window.destroy()
@@ -1,10 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-import sqlite3
-import re
 import os
 from common_styles import COLORS, STYLES
+from image_loader import AsyncImageLoader
+from db import get_connection
+from student_picker import StudentPicker
+from card_view import IMAGE_SIZES
+import metrics
+import validation
+import repository
+import profiling
+import asset_store
+import records
 
 class CardEditApp:
     def __init__(self, root, parent=None):
@@ -14,10 +21,19 @@ class CardEditApp:
         self.root.attributes('-fullscreen', True)
         self.root.configure(bg=COLORS["light"])
 
-        # Connect to SQLite database
-        self.connection = sqlite3.connect('sqlite.db')
+        # Shared SQLite connection
+        self.connection = get_connection()
         self.cursor = self.connection.cursor()
 
+        # Decodes card images off the Tk thread
+        self.image_loader = AsyncImageLoader(self.root)
+        # Closing the window goes back the same way, stopping the loader
+        self.root.protocol("WM_DELETE_WINDOW", self.go_back)
+
+        # Edit window, built on first use and reused for every record
+        self.edit_window = None
+        self.image_labels = []
+
         # Create main container
         self.main_container = tk.Frame(self.root, bg=COLORS["light"])
         self.main_container.pack(expand=True, fill="both", padx=40, pady=20)
@@ -40,21 +56,11 @@ class CardEditApp:
         search_frame = tk.Frame(self.main_container, bg=COLORS["light"])
         search_frame.pack(fill="x", pady=20)
 
-        # Name dropdown with label
-        name_label = tk.Label(search_frame,
-                             text="Select Student:",
-                             **STYLES["label"])
-        name_label.pack(side="left", padx=(0, 10))
-
-        # Get names and create dropdown
-        self.names = self.get_names_from_database()
-        self.selected_name = tk.StringVar()
-        self.name_dropdown = ttk.Combobox(search_frame,
-                                        textvariable=self.selected_name,
-                                        values=self.names,
-                                        font=STYLES["entry"]["font"],
-                                        width=30)
-        self.name_dropdown.pack(side="left", padx=10)
+        # Type-ahead student search
+        self.picker = StudentPicker(search_frame,
+                                    self.connection,
+                                    command=self.display_card)
+        self.picker.pack(side="left", fill="x", expand=True, padx=(0, 10))
 
         # Edit button
         self.edit_button = tk.Button(search_frame,
@@ -63,49 +69,77 @@ class CardEditApp:
                                     bg=COLORS["success"],
                                     fg=COLORS["light"],
                                     **STYLES["button"])
-        self.edit_button.pack(side="left", padx=10)
-
-    def get_names_from_database(self):
-        self.cursor.execute("SELECT nm FROM id")
-        return [row[0] for row in self.cursor.fetchall()]
+        self.edit_button.pack(side="left", padx=10, anchor="n")
 
     def display_card(self):
-        selected_name = self.selected_name.get()
-        if selected_name:
-            self.cursor.execute("SELECT * FROM id WHERE nm=?", (selected_name,))
-            data = self.cursor.fetchone()
+        record_id = self.picker.get_selected_id()
+        if record_id is not None:
+            data = records.get_record(self.connection, record_id)
             if data:
+                # Image paths as stored, so references can be moved on save
+                self.saved_images = (data["std_img"], data["std_sign"], data["p_sign"])
                 self.display_card_window(data)
             else:
-                messagebox.showerror("Error", "No data found for selected name.")
+                messagebox.showerror("Error", "No data found for selected student.")
         else:
-            messagebox.showerror("Error", "Please select a name.")
+            messagebox.showerror("Error", "Please select a student.")
 
+    @profiling.operation("open_card")
+    @metrics.timed("ui.edit_window")
     def display_card_window(self, data):
         # Store data in instance variables
-        self.row = data[0]
-        self.std = data[1]
-        self.div = data[2]
-        self.dob = data[3]
-        self.roll = data[4]
-        self.nm = data[5]
-        self.yr = data[6]
-        self.std_img = data[7]
-        self.std_sign = data[8]
-        self.p_sign = data[9]
+        self.record_id = data["id"]
+        self.version = data["version"]
+        self.std = data["standard"]
+        self.div = data["division"]
+        self.dob = data["dob"]
+        self.roll = data["rollno"]
+        self.nm = data["nm"]
+        self.yr = data["yr"]
+        self.std_img = data["std_img"]
+        self.std_sign = data["std_sign"]
+        self.p_sign = data["p_sign"]
 
         # Create edit window
-        self.root = tk.Toplevel(self.parent)
-        self.root.title("Information Display")
-        self.root.geometry(f"{self.root.winfo_screenwidth()}x{self.root.winfo_screenheight()}")
-        self.root.configure(bg="#ffffff")
+        if self.edit_window is None or not self.edit_window.winfo_exists():
+            self.edit_window = tk.Toplevel(self.root)
+            self.edit_window.title("Information Display")
+            self.edit_window.geometry(
+                f"{self.edit_window.winfo_screenwidth()}x{self.edit_window.winfo_screenheight()}")
+            self.edit_window.configure(bg="#ffffff")
+            self.edit_window.protocol("WM_DELETE_WINDOW", self.close_edit_window)
+            self.create_edit_form()
+
+        # Populate input fields in place
+        self.populate_edit_form()
+        self.edit_window.deiconify()
+        self.edit_window.lift()
+
+    def populate_edit_form(self):
+        """Fill the existing form widgets with the current record"""
+        values = [
+            (self.name_entry, self.nm),
+            (self.standard_entry, self.std),
+            (self.division_entry, self.div),
+            (self.academic_year_entry, self.yr),
+            (self.date_of_birth_entry, self.dob),
+            (self.roll_number_entry, str(self.roll))
+        ]
+        for widget, value in values:
+            if isinstance(widget, ttk.Combobox):
+                widget.set(value)
+            else:
+                widget.delete(0, "end")
+                widget.insert(0, value)
 
-        # Create and populate input fields
-        self.create_edit_form()
+        for idx in range(len(self.image_labels)):
+            self.refresh_image(idx)
+        self.has_unsaved_changes = False
 
+    @metrics.timed("ui.build_edit_form")
     def create_edit_form(self):
         # Create responsive container
-        container = tk.Frame(self.root, **STYLES["main_container"])
+        container = tk.Frame(self.edit_window, **STYLES["main_container"])
         container.pack(expand=True, fill="both")
         
         # Configure grid weights
@@ -151,7 +185,7 @@ class CardEditApp:
         # Back button
         back_btn = tk.Button(buttons_frame,
                             text="Back",
-                            command=self.go_back,
+                            command=self.close_edit_window,
                             bg=COLORS["gray"],
                             fg=COLORS["light"],
                             font=("Helvetica", 12),
@@ -207,37 +241,31 @@ class CardEditApp:
             {
                 "name": "Name",
                 "type": "entry",
-                "value": self.nm,
                 "values": None
             },
             {
                 "name": "Standard",
                 "type": "combo",
-                "value": self.std,
                 "values": standards
             },
             {
                 "name": "Division",
                 "type": "combo",
-                "value": self.div,
                 "values": divisions
             },
             {
                 "name": "Academic Year",
                 "type": "combo",
-                "value": self.yr,
                 "values": academic_years
             },
             {
                 "name": "Date of Birth",
                 "type": "entry",
-                "value": self.dob,
                 "values": None
             },
             {
                 "name": "Roll Number",
                 "type": "entry",
-                "value": str(self.roll),
                 "values": None
             }
         ]
@@ -262,7 +290,6 @@ class CardEditApp:
                                     values=field["values"],
                                     font=("Helvetica", 12),
                                     state="readonly")
-                widget.set(field["value"])
                 widget.bind('<<ComboboxSelected>>', self.on_field_change)
             else:  # entry
                 widget = tk.Entry(row, 
@@ -270,7 +297,6 @@ class CardEditApp:
                                 bg="#f8f9fa", 
                                 relief="solid",
                                 borderwidth=1)
-                widget.insert(0, field["value"])
                 widget.bind('<KeyRelease>', self.on_field_change)
             
             widget.pack(side="left", expand=True, fill="x")
@@ -290,13 +316,10 @@ class CardEditApp:
         title_label.pack(pady=(0, 20))
 
         # Image frames
-        image_types = [
-            ("Student Photo", self.std_img),
-            ("Student Signature", self.std_sign),
-            ("Principal Signature", self.p_sign)
-        ]
+        image_types = ["Student Photo", "Student Signature", "Principal Signature"]
 
-        for i, (label, image_path) in enumerate(image_types):
+        self.image_labels = []
+        for i, label in enumerate(image_types):
             frame = tk.Frame(parent, bg="#ffffff")
             frame.pack(fill="x", pady=10)
 
@@ -307,26 +330,10 @@ class CardEditApp:
                     fg="#666666",
                     bg="#ffffff").pack(anchor="w")
 
-            try:
-                # Display current image
-                image = Image.open(image_path)
-                if "Photo" in label:
-                    image = image.resize((150, 150))
-                else:
-                    image = image.resize((100, 50))
-                photo = ImageTk.PhotoImage(image)
-                img_label = tk.Label(frame, image=photo, bg="#ffffff")
-                img_label.image = photo
-                img_label.pack(pady=5)
-            except Exception:
-                # Show placeholder if image can't be loaded
-                placeholder = tk.Label(frame,
-                                     text="No image available",
-                                     bg="#f0f0f0",
-                                     fg="#666666",
-                                     width=20,
-                                     height=4)
-                placeholder.pack(pady=5)
+            # Image slot, filled by refresh_image
+            img_label = tk.Label(frame, bg="#ffffff")
+            img_label.pack(pady=5)
+            self.image_labels.append(img_label)
 
             # Change image button
             change_btn = tk.Button(frame,
@@ -369,29 +376,47 @@ class CardEditApp:
                             relief="flat")
         exit_btn.pack(side="left", padx=5)
 
+    def close_edit_window(self):
+        """Hide the edit window (kept for the next record) and return to the search"""
+        if self.has_unsaved_changes:
+            if not messagebox.askyesno("Confirm", "You have unsaved changes. Are you sure you want to go back?"):
+                return
+        self.has_unsaved_changes = False
+        self.edit_window.withdraw()
+
     def go_back(self):
         """Handle back button click"""
         if self.has_unsaved_changes:
-            if messagebox.askyesno("Confirm", "You have unsaved changes. Are you sure you want to go back?"):
-                self.root.destroy()
-                if self.parent:
-                    self.parent.deiconify()
-        else:
-            self.root.destroy()
-            if self.parent:
-                self.parent.deiconify()
+            if not messagebox.askyesno("Confirm", "You have unsaved changes. Are you sure you want to go back?"):
+                return
+        self.image_loader.shutdown()
+        self.root.destroy()
+        if self.parent:
+            self.parent.deiconify()
 
     def exit_app(self):
         """Handle exit button click"""
         if messagebox.askokcancel("Exit", "Are you sure you want to exit?"):
             self.root.quit()
 
-    def __del__(self):
-        try:
-            if hasattr(self, 'connection') and self.connection:
-                self.connection.close()
-        except Exception as e:
-            print(f"Error closing database connection: {e}")
+    def refresh_image(self, idx):
+        """Reload a single image slot from the current path"""
+        path = (self.std_img, self.std_sign, self.p_sign)[idx]
+        size = IMAGE_SIZES[asset_store.IMAGE_COLUMNS[idx]]
+        # Undo any "No image available" text left from a previous record
+        self.image_labels[idx].configure(text="", width=0, height=0, bg="#ffffff")
+        self.image_loader.load_into(self.image_labels[idx], path, size,
+                                    on_error=self.show_missing_image)
+
+    def show_missing_image(self, img_label, error):
+        # Show placeholder if image can't be loaded
+        img_label.configure(image="",
+                            text="No image available",
+                            bg="#f0f0f0",
+                            fg="#666666",
+                            width=20,
+                            height=4)
+        img_label.image = None
 
     def change_image(self, idx):
         file_path = filedialog.askopenfilename(
@@ -406,78 +431,98 @@ class CardEditApp:
             else:
                 self.p_sign = file_path
             
-            # Refresh the image display
-            self.display_card_window(
-                (self.row, self.std, self.div, self.dob, self.roll, 
-                 self.nm, self.yr, self.std_img, self.std_sign, self.p_sign)
-            )
+            # Refresh only the changed image
+            self.refresh_image(idx)
             self.has_unsaved_changes = True  # Mark changes when images are changed
 
+    @profiling.operation("save")
     def save_changes(self):
+        prepared = ()
         try:
             # Get updated values
-            name = self.name_entry.get()
-            standard = self.standard_entry.get()
-            division = self.division_entry.get()
-            dob = self.date_of_birth_entry.get()
-            roll_no = self.roll_number_entry.get()
-            academic_year = self.academic_year_entry.get()
-
-            # Basic validation
-            if not all([name, standard, division, dob, roll_no, academic_year]):
-                messagebox.showerror('Error', 'All fields are required')
-                return
-
-            # Validate roll number
-            try:
-                roll_no = int(roll_no)
-                if not (1 <= roll_no <= 60):
-                    messagebox.showerror('Error', 'Roll number must be between 1 and 60')
-                    return
-            except ValueError:
-                messagebox.showerror('Error', 'Roll number must be numeric')
-                return
-
-            # Validate date format
-            if not re.match(r'^\d{4}-\d{2}-\d{2}$', dob):
-                messagebox.showerror('Error', 'Date must be in YYYY-MM-DD format')
-                return
-
-            # Validate name
-            if not all(char.isalpha() or char.isspace() for char in name):
-                messagebox.showerror('Error', 'Name should contain only letters and spaces')
-                return
-
-            # Check if roll number exists for another student
-            self.cursor.execute("""
-                SELECT id FROM id 
-                WHERE rollno=? AND yr=? AND id!=?
-            """, (roll_no, academic_year, self.row))
-            
-            if self.cursor.fetchone():
-                messagebox.showerror('Error', 
-                    'Roll number already exists for another student in this academic year')
+            values, errors = validation.validate_record({
+                "nm": self.name_entry.get(),
+                "standard": self.standard_entry.get(),
+                "division": self.division_entry.get(),
+                "dob": self.date_of_birth_entry.get(),
+                "rollno": self.roll_number_entry.get(),
+                "yr": self.academic_year_entry.get(),
+            })
+            if errors:
+                messagebox.showerror('Error', validation.describe(errors))
                 return
 
-            # Update database
-            self.cursor.execute("""
-                UPDATE id 
-                SET standard=?, division=?, dob=?, rollno=?, nm=?, yr=?, 
-                    std_img=?, std_sign=?, p_sign=?
-                WHERE id=?
-            """, (standard, division, dob, roll_no, name, academic_year,
-                  self.std_img, self.std_sign, self.p_sign, self.row))
-
-            self.connection.commit()
+            # Store newly selected images as deduplicated assets, before taking the write lock
+            with metrics.span("image.ingest"):
+                prepared = asset_store.prepare_record_images(
+                    (self.std_img, self.std_sign, self.p_sign), missing_ok=True)
+            image_paths = asset_store.replace_record_images(self.cursor, self.saved_images, prepared)
+
+            # Update database, unless another desk saved this student after we loaded it
+            version = repository.update_student(
+                self.cursor, self.record_id, self.version, values, image_paths)
+
+            with metrics.span("db.commit"):
+                self.connection.commit()
+            self.version = version
+            self.std_img, self.std_sign, self.p_sign = image_paths
+            self.saved_images = image_paths
+            asset_store.collect_garbage(self.connection)
             messagebox.showinfo('Success', 'Changes saved successfully')
             self.has_unsaved_changes = False  # Reset flag after saving
-            self.root.destroy()
-            if self.parent:
-                self.parent.deiconify()
-
+            self.edit_window.withdraw()
+            # Names, classes or roll numbers shown in the results may have changed
+            self.picker.refresh()
+
+        except repository.DuplicateRollNumber:
+            self.connection.rollback()
+            asset_store.discard(self.connection, prepared)
+            messagebox.showerror('Error', 
+                'Roll number already exists for another student in this academic year')
+        except repository.StaleRecord:
+            self.connection.rollback()
+            asset_store.discard(self.connection, prepared)
+            self.reload_stale_record()
         except Exception as e:
+            self.connection.rollback()
+            asset_store.discard(self.connection, prepared)
             messagebox.showerror('Error', f'Failed to save changes: {str(e)}')
 
+    def reload_stale_record(self):
+        """Another desk saved this student first; load their version or overwrite it"""
+        data = records.get_record(self.connection, self.record_id)
+        if data is None:
+            messagebox.showerror('Error', 'This student was deleted at another desk')
+            self.edit_window.withdraw()
+            self.picker.refresh()
+            return
+
+        answer = messagebox.askyesnocancel(
+            'Record Changed',
+            'This student was changed at another desk after you opened it.\n\n'
+            'Yes: load their changes (your unsaved edits are lost)\n'
+            'No: save your version over theirs\n'
+            'Cancel: keep editing without saving')
+        if answer is None:
+            return
+
+        current_images = (data["std_img"], data["std_sign"], data["p_sign"])
+        if answer:
+            self.saved_images = current_images
+            self.display_card_window(data)
+            self.picker.refresh()
+            return
+
+        # Overwrite: keep the images chosen here, but take the other desk's
+        # for slots left untouched, since their old image may already be gone
+        chosen = (self.std_img, self.std_sign, self.p_sign)
+        self.std_img, self.std_sign, self.p_sign = (
+            mine if mine != saved else theirs
+            for mine, saved, theirs in zip(chosen, self.saved_images, current_images))
+        self.saved_images = current_images
+        self.version = data["version"]
+        self.save_changes()
+
     def on_field_change(self, *args):
         self.has_unsaved_changes = True
 
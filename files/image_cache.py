@@ -0,0 +1,149 @@
+"""LRU cache of decoded, already-resized card images"""
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageOps
+import metrics
+
+DEFAULT_MAX_MB = 64
+
+
+def to_rgb(image, background=(255, 255, 255)):
+    """RGB version of image; transparent areas are composited onto background"""
+    if image.mode == "RGB":
+        return image
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        flat = Image.new("RGB", image.size, background)
+        flat.paste(rgba, mask=rgba.getchannel("A"))
+        return flat
+    return image.convert("RGB")
+
+
+def load_thumbnail(path, size):
+    """Decode an image at reduced scale and resample it to the requested size.
+
+    JPEGs are decoded by libjpeg at the smallest 1/2, 1/4 or 1/8 scale that is
+    still at least as large as the target, so a 12 MP phone photo never has to
+    be decoded at full resolution. Other formats are box-reduced by an integer
+    factor before the final Lanczos resample.
+    """
+    with Image.open(path) as image:
+        if image.format == "JPEG":
+            # Request a square draft so a later EXIF rotation still covers the target
+            side = max(size)
+            image.draft("RGB", (side, side))
+        image = to_rgb(ImageOps.exif_transpose(image))
+        return image.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+
+class ImageCache:
+    """Thread-safe LRU cache keyed by file path, mtime, file size and target size.
+
+    Cached images are shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(path, size):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tuple(size))
+
+    @staticmethod
+    def image_bytes(image):
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, path, size):
+        """Return the decoded image at the given size, decoding it on a miss"""
+        key = self.make_key(path, size)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        # Decode outside the lock so other threads are not blocked
+        with metrics.span("image.decode"):
+            image = load_thumbnail(path, size)
+        self.put(key, image)
+        return image
+
+    def put(self, key, image):
+        cost = self.image_bytes(image)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self.image_bytes(self._entries.pop(key))
+            self._entries[key] = image
+            self.current_bytes += cost
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self.image_bytes(evicted)
+
+    def resize_limit(self, max_bytes):
+        """Change the memory ceiling, evicting entries as needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entries and self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self.image_bytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def _configured_max_mb():
+    """IDCARD_IMAGE_CACHE_MB (fractions allowed), or the default if unset or invalid"""
+    value = os.environ.get("IDCARD_IMAGE_CACHE_MB")
+    if value is None:
+        return DEFAULT_MAX_MB
+    try:
+        max_mb = float(value)
+        if math.isfinite(max_mb) and max_mb >= 0:
+            return max_mb
+    except ValueError:
+        pass
+    logging.warning(f"Ignoring invalid IDCARD_IMAGE_CACHE_MB={value!r}; using {DEFAULT_MAX_MB} MB")
+    return DEFAULT_MAX_MB
+
+
+# Process-wide cache shared by all screens and the renderer
+default_cache = ImageCache(int(_configured_max_mb() * 1024 * 1024))
+
+
+def get_image(path, size):
+    """Return a cached, resized image from the process-wide cache"""
+    return default_cache.get(path, size)
+
+
+def set_cache_limit(max_mb):
+    """Set the memory ceiling of the process-wide cache in megabytes"""
+    default_cache.resize_limit(int(max_mb * 1024 * 1024))
@@ -0,0 +1,111 @@
+"""Background image decoding for Tk screens"""
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageTk
+from image_cache import get_image
+import metrics
+import profiling
+
+DEFAULT_WORKERS = 4
+POLL_MS = 15
+PLACEHOLDER_COLOR = "#e0e0e0"
+
+
+class AsyncImageLoader:
+    """Decode and resize images on worker threads, deliver them on the Tk thread.
+
+    Tk may only be touched from the thread running mainloop, so workers put
+    finished PIL images on a queue and an ``after()`` poll (running only while
+    loads are outstanding) creates the PhotoImage and updates the label.
+    """
+
+    def __init__(self, widget, workers=DEFAULT_WORKERS, poll_ms=POLL_MS):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="image-loader")
+        self._results = queue.Queue()
+        self._pending = 0
+        self._poll_id = None
+        self._placeholders = {}
+
+    def placeholder(self, size):
+        """Blank PhotoImage of the given size, shown until the real image arrives"""
+        if size not in self._placeholders:
+            self._placeholders[size] = ImageTk.PhotoImage(
+                Image.new("RGB", size, PLACEHOLDER_COLOR))
+        return self._placeholders[size]
+
+    def load(self, path, size, callback):
+        """Load path at size in the background; callback(image, error) runs on the Tk thread"""
+        self._pending += 1
+        future = self._executor.submit(profiling.background(get_image), path, size)
+        future.add_done_callback(lambda f: self._results.put((callback, f)))
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+        return future
+
+    def load_into(self, label, path, size, on_error=None):
+        """Show a placeholder in label now and swap in the image once decoded"""
+        label.configure(image=self.placeholder(size))
+        label.image = self.placeholder(size)
+        label.pending_path = path
+
+        def deliver(image, error):
+            # The window may have closed, or a newer image been requested, meanwhile
+            try:
+                if not label.winfo_exists() or label.pending_path != path:
+                    return
+            except tk.TclError:
+                return
+            if error is not None:
+                if on_error:
+                    on_error(label, error)
+                else:
+                    print(f"Error loading image {path}: {error}")
+                return
+            with metrics.span("ui.photo_image"):
+                photo = ImageTk.PhotoImage(image)
+            label.configure(image=photo)
+            label.image = photo
+
+        return self.load(path, size, deliver)
+
+    def prefetch(self, path, size):
+        """Decode path into the shared image cache without displaying it"""
+        if path:
+            self._executor.submit(profiling.background(get_image), path, size)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                callback, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            error = future.exception()
+            try:
+                callback(None if error else future.result(), error)
+            except Exception as e:
+                print(f"Error delivering image: {e}")
+
+        if self._pending > 0:
+            try:
+                self._poll_id = self.widget.after(self.poll_ms, self._poll)
+            except tk.TclError:
+                # Owning widget destroyed; nothing left to deliver to
+                self._pending = 0
+
+    def shutdown(self):
+        """Stop polling and drop queued work (running decodes finish in the background)"""
+        if self._poll_id is not None:
+            try:
+                self.widget.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,300 @@
+"""Bulk import of student records from CSV or Excel"""
+import argparse
+import csv
+import os
+import sys
+import time
+import db
+import asset_store
+import validation
+import repository
+from migrations import migrate, DuplicateRollNumbers
+
+# Accepted header spellings for each id table column
+HEADER_ALIASES = {
+    "nm": ("nm", "name", "student name"),
+    "standard": ("standard", "std", "class"),
+    "division": ("division", "div"),
+    "yr": ("yr", "year", "academic year", "academic_year"),
+    "dob": ("dob", "date of birth", "date_of_birth", "birth date"),
+    "rollno": ("rollno", "roll no", "roll_no", "roll number", "roll_number"),
+    "std_img": ("std_img", "photo", "student photo"),
+    "std_sign": ("std_sign", "signature", "student signature"),
+    "p_sign": ("p_sign", "principal signature"),
+}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp")
+
+def normalize_header(header):
+    """Map a spreadsheet header to an id table column name (or None)"""
+    key = (header or "").strip().lower()
+    for column, aliases in HEADER_ALIASES.items():
+        if key in aliases:
+            return column
+    return None
+
+
+def read_csv(path):
+    """Yield rows of a CSV file as dicts keyed by column name"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        headers = [normalize_header(h) for h in next(reader, [])]
+        for values in reader:
+            yield {column: value for column, value in zip(headers, values) if column}
+
+
+def read_xlsx(path):
+    """Yield rows of the first worksheet of an .xlsx file"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Reading .xlsx files requires the openpyxl package")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(str(h) if h is not None else "") for h in next(rows, [])]
+        for values in rows:
+            record = {}
+            for column, value in zip(headers, values):
+                if not column:
+                    continue
+                if hasattr(value, "strftime"):
+                    value = value.strftime("%Y-%m-%d")
+                record[column] = "" if value is None else str(value)
+            yield record
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        return read_xlsx(path)
+    return read_csv(path)
+
+
+def read_chunks(path, size):
+    """Lists of up to size (line, record) pairs, skipping blank rows"""
+    chunk = []
+    # Line 1 is the header row
+    for line, record in enumerate(read_rows(path), start=2):
+        if not any((value or "").strip() for value in record.values()):
+            continue
+        chunk.append((line, record))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImageResolver:
+    """Find photo and signature files by naming convention.
+
+    For a student with roll number 12 in 2023-24 the importer looks for
+    ``12_photo.*`` and ``12_sign.*`` in ``<images>/2023-24/`` and then in
+    ``<images>/``. The principal signature is ``principal_sign.*`` unless given
+    explicitly. Each directory is listed once, not once per row.
+    """
+
+    def __init__(self, images_dir=None, principal_sign=None):
+        self.images_dir = images_dir
+        self.principal_sign = principal_sign
+        self._listings = {}
+
+    def _listing(self, directory):
+        if directory not in self._listings:
+            files = {}
+            if directory and os.path.isdir(directory):
+                for entry in os.scandir(directory):
+                    stem, extension = os.path.splitext(entry.name)
+                    if entry.is_file() and extension.lower() in IMAGE_EXTENSIONS:
+                        files.setdefault(stem.lower(), entry.path)
+            self._listings[directory] = files
+        return self._listings[directory]
+
+    def find(self, stem, year=None):
+        if not self.images_dir:
+            return None
+        directories = [self.images_dir]
+        if year:
+            directories.insert(0, os.path.join(self.images_dir, year))
+        for directory in directories:
+            path = self._listing(directory).get(stem.lower())
+            if path:
+                return path
+        return None
+
+    def resolve(self, record):
+        """Fill in missing image paths; returns a list of (field, message) errors"""
+        if not record.get("std_img"):
+            record["std_img"] = self.find(f"{record['rollno']}_photo", record["yr"])
+        if not record.get("std_sign"):
+            record["std_sign"] = self.find(f"{record['rollno']}_sign", record["yr"])
+        if not record.get("p_sign"):
+            record["p_sign"] = self.principal_sign or self.find("principal_sign", record["yr"])
+
+        errors = []
+        for field, label in (("std_img", "Student photo"), ("std_sign", "Student signature"),
+                             ("p_sign", "Principal signature")):
+            if not record.get(field) or not os.path.exists(record[field]):
+                errors.append((field, f"{label} not found"))
+        return errors
+
+
+def _image_paths(record):
+    return (record["std_img"], record["std_sign"], record["p_sign"])
+
+
+def _insert_batch(connection, batch, ingest):
+    """Insert a batch in one transaction; returns the line numbers that failed with errors"""
+    errors = []
+    prepared = {}
+    if ingest:
+        # Decode and write images before taking the write lock
+        for line, record in batch:
+            try:
+                prepared[line] = asset_store.prepare_record_images(_image_paths(record))
+            except Exception as e:
+                errors.append((line, "", str(e)))
+        batch = [(line, record) for line, record in batch if line in prepared]
+
+    def stored_paths(cursor, line, record):
+        if ingest:
+            return asset_store.acquire_record_images(cursor, prepared[line])
+        return _image_paths(record)
+
+    cursor = connection.cursor()
+    try:
+        values = [repository.record_params(record, stored_paths(cursor, line, record))
+                  for line, record in batch]
+        cursor.executemany(repository.INSERT_SQL, values)
+        connection.commit()
+        return errors
+    except Exception:
+        connection.rollback()
+
+    # Something in the batch was rejected; retry row by row to isolate it
+    rejected = []
+    for line, record in batch:
+        try:
+            repository.insert_student(cursor, record, stored_paths(cursor, line, record))
+            connection.commit()
+            continue
+        except repository.DuplicateRollNumber:
+            connection.rollback()
+            errors.append((line, "rollno", "Roll number already exists for this academic year"))
+        except Exception as e:
+            connection.rollback()
+            errors.append((line, "", str(e)))
+        if ingest:
+            rejected.extend(prepared[line])
+    # Files written only for rejected rows would otherwise never be collected
+    asset_store.discard(connection, rejected)
+    errors.sort(key=lambda error: error[0])
+    return errors
+
+
+def import_records(path, connection=None, images_dir=None, principal_sign=None,
+                   batch_size=500, ingest=True):
+    """Import a CSV/XLSX file; returns a summary with a per-row error report.
+
+    Invalid rows are reported and skipped rather than aborting the import.
+    """
+    connection = connection or db.get_connection()
+    resolver = ImageResolver(images_dir, principal_sign)
+
+    # Existing (yr, rollno) pairs, so duplicates are reported without a query per row
+    existing = {(yr, rollno) for yr, rollno in connection.execute("SELECT yr, rollno FROM id")}
+
+    start = time.perf_counter()
+    errors = []
+    inserted = 0
+    total = 0
+
+    for chunk in read_chunks(path, batch_size):
+        total += len(chunk)
+        values, invalid = validation.validate_batch([record for _, record in chunk])
+        chunk_errors = [(chunk[index][0], field, message) for index, field, message in invalid]
+        rejected = {index for index, _, _ in invalid}
+
+        batch = []
+        for index, (line, record) in enumerate(chunk):
+            if index in rejected:
+                continue
+            record.update(values[index])
+            key = (record["yr"], record["rollno"])
+            if key in existing:
+                row_errors = [("rollno", "Roll number already exists for this academic year")]
+            else:
+                row_errors = resolver.resolve(record)
+            if row_errors:
+                chunk_errors.extend((line, field, message) for field, message in row_errors)
+                continue
+            existing.add(key)
+            batch.append((line, record))
+
+        # Keep the report in file order
+        chunk_errors.sort(key=lambda error: error[0])
+        errors.extend(chunk_errors)
+        if batch:
+            batch_errors = _insert_batch(connection, batch, ingest)
+            inserted += len(batch) - len(batch_errors)
+            errors.extend(batch_errors)
+
+    return {
+        "total": total,
+        "inserted": inserted,
+        "errors": errors,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def write_error_report(errors, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["line", "field", "error"])
+        writer.writerows(errors)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import student records from CSV or Excel")
+    parser.add_argument("file", help="CSV or .xlsx file with one student per row")
+    parser.add_argument("--db", default="sqlite.db", help="Path to the SQLite database")
+    parser.add_argument("--images", help="Directory containing <rollno>_photo / <rollno>_sign files")
+    parser.add_argument("--principal-sign", help="Principal signature used for every row")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--keep-paths", action="store_true",
+                        help="Store image paths as-is instead of ingesting them into assets/")
+    parser.add_argument("--report", help="Write the per-row error report to this CSV file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    db.set_database_path(args.db)
+    try:
+        migrate(db.get_connection())
+    except DuplicateRollNumbers as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    summary = import_records(args.file, images_dir=args.images,
+                             principal_sign=args.principal_sign,
+                             batch_size=args.batch_size, ingest=not args.keep_paths)
+
+    print(f"Imported {summary['inserted']} of {summary['total']} rows "
+          f"in {summary['seconds']:.2f}s")
+    if summary["errors"]:
+        print(f"{len(summary['errors'])} errors:")
+        for line, field, message in summary["errors"][:20]:
+            print(f"  line {line}: {field} {message}".rstrip())
+        if len(summary["errors"]) > 20:
+            print(f"  ... {len(summary['errors']) - 20} more")
+        if args.report:
+            write_error_report(summary["errors"], args.report)
+            print(f"Error report written to {args.report}")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
+import time
+
+# Taken before any other import so the startup report includes import time
+STARTUP_START = time.perf_counter()
+
 import os
 import sys
+import argparse
+import queue
+import threading
 
 # Add the current directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -7,14 +15,16 @@ if current_dir not in sys.path:
     sys.path.append(current_dir)
 
 import tkinter as tk
-from card_creation import ImageDisplayApp
-from view import CardDisplayApp
-from edit import CardEditApp
 import logging
-from PIL import Image, ImageTk
 import tkinter.messagebox as messagebox
-import sqlite3
-from database_setup import initialize_database
+from db import close_connection
+from branding import get_registry
+import metrics
+import profiling
+
+# Screens are imported on first use (they pull in PIL, image caches and the
+# PDF exporter); preload_screens() warms them in the background after startup.
+SCREEN_MODULES = ("card_creation", "view", "edit")
 
 def setup_logging():
     log_dir = "logs"
@@ -26,18 +36,72 @@ def setup_logging():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
+
+class StartupTimer:
+    """Records how long each startup phase took, measured from process start"""
+
+    def __init__(self, start=STARTUP_START):
+        self.start = start
+        self.marks = []
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter() - self.start))
+
+    def report(self):
+        return "Startup: " + ", ".join(f"{phase} {seconds * 1000:.0f}ms"
+                                       for phase, seconds in self.marks)
+
+
+def check_database_schema():
+    """Startup database checks; returns an error message, or None if all is well"""
+    from database_setup import initialize_database
+    from db import get_connection
+    from migrations import current_version, SCHEMA_VERSION, DuplicateRollNumbers
+
+    try:
+        # Schema is brought up to date by initialize_database; confirm it is current
+        if not initialize_database():
+            return "Failed to initialize database"
+        version = current_version(get_connection())
+        if version != SCHEMA_VERSION:
+            return (f"Database schema version {version} does not match "
+                    f"expected version {SCHEMA_VERSION}")
+        return None
+    except DuplicateRollNumbers as e:
+        return str(e)
+    except Exception as e:
+        return f"Failed to connect to database: {str(e)}"
+    finally:
+        # This thread's connection is not used again
+        close_connection()
+
+
+def preload_screens():
+    """Import the screen modules ahead of the first click"""
+    for name in SCREEN_MODULES:
+        try:
+            __import__(name)
+        except Exception as e:
+            logging.warning(f"Could not preload {name}: {e}")
+
 class MainApplication:
-    def __init__(self, root):
+    def __init__(self, root, timer=None, startup_report=False):
+        # Initialize logging
+        setup_logging()
+
+        self.timer = timer or StartupTimer()
+        # Print the startup timings to the console as well as the log
+        self.startup_report = startup_report
+        self.timer.mark("imports")
+
         if not self.check_required_files():
             root.quit()
             return
-        # Initialize database first
-        if not initialize_database():
-            messagebox.showerror("Error", "Failed to initialize database")
-            root.quit()
-            return
-            
+
         self.root = root
+
+        self.menu_buttons = []
+        self._startup_results = queue.Queue()
         self.root.title("Student ID Card Generator")
         self.root.state("zoomed")  # Make window maximized
         
@@ -75,16 +139,20 @@ class MainApplication:
         # Create footer
         self.create_footer()
         
-        # Initialize logging
-        setup_logging()
-        
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
-        
-        # Check database connection
-        if not self.check_database():
-            self.root.quit()
 
+        # Developer diagnostics panel (timing histograms)
+        self.root.bind_all('<Control-Shift-D>', lambda e: self.open_diagnostics())
+        self.timer.mark("menu built")
+
+        # Paint the menu first; the logo and database checks follow
+        self.root.after_idle(self.on_first_paint)
+
+    def on_first_paint(self):
+        self.timer.mark("first paint")
+        self.load_logo()
+        self.check_database()
     def create_header(self):
         # Header container
         header_frame = tk.Frame(self.main_container, bg="#f0f2f5")
@@ -95,27 +163,13 @@ class MainApplication:
         logo_frame.pack_propagate(False)
         logo_frame.pack(side="left", padx=(0, 20))
 
-        try:
-            # Load and display college logo
-            logo_path = "logo_college.jpg"
-            if os.path.exists(logo_path):
-                logo_image = Image.open(logo_path)
-                logo_image = logo_image.resize((80, 80))
-                logo_photo = ImageTk.PhotoImage(logo_image)
-                
-                logo_label = tk.Label(logo_frame, image=logo_photo, bg="#f0f2f5")
-                logo_label.image = logo_photo
-                logo_label.pack(fill="both", expand=True)
-            else:
-                # Create text-based placeholder
-                placeholder = tk.Label(logo_frame,
-                                    text="LOGO",
-                                    font=("Helvetica", 14, "bold"),
-                                    fg="#666666",
-                                    bg="#f0f2f5")
-                placeholder.pack(fill="both", expand=True)
-        except Exception as e:
-            print(f"Note: Logo not loaded - {e}")
+        # Text placeholder, replaced by the logo once PIL has loaded
+        self.logo_label = tk.Label(logo_frame,
+                                   text="LOGO",
+                                   font=("Helvetica", 14, "bold"),
+                                   fg="#666666",
+                                   bg="#f0f2f5")
+        self.logo_label.pack(fill="both", expand=True)
 
         # Title and subtitle
         title_frame = tk.Frame(header_frame, bg="#f0f2f5")
@@ -135,6 +189,16 @@ class MainApplication:
                                 bg="#f0f2f5")
         subtitle_label.pack(anchor="w")
 
+    def load_logo(self):
+        try:
+            # Load and display college logo (decoded once for the session)
+            logo_photo = get_registry().photo("logo", (80, 80))
+            if logo_photo is not None:
+                self.logo_label.configure(image=logo_photo, text="")
+                self.logo_label.image = logo_photo
+        except Exception as e:
+            print(f"Note: Logo not loaded - {e}")
+
     def create_menu_options(self):
         # Menu options container with shadow effect
         options_frame = tk.Frame(self.main_container, 
@@ -242,6 +306,10 @@ class MainApplication:
                              activeforeground="white",
                              cursor="hand2")  # Change cursor on hover
             button.pack(anchor="w")
+            if option["command"] != self.quit_app:
+                # Enabled once the background database check succeeds
+                button.configure(state="disabled")
+                self.menu_buttons.append(button)
 
             # Create tooltip
             self.create_tooltip(button, option["tooltip"])
@@ -264,6 +332,7 @@ class MainApplication:
 
     def open_student_details(self):
         try:
+            from card_creation import ImageDisplayApp
             self.root.withdraw()  # Hide main window
             image_display_window = tk.Toplevel(self.root)
             image_display_window.protocol("WM_DELETE_WINDOW", 
@@ -275,6 +344,7 @@ class MainApplication:
 
     def view_id_card_interface(self):
         try:
+            from view import CardDisplayApp
             self.root.withdraw()  # Hide main window
             view_id = tk.Toplevel(self.root)
             view_id.protocol("WM_DELETE_WINDOW", 
@@ -286,6 +356,7 @@ class MainApplication:
 
     def edit_id_card(self):
         try:
+            from edit import CardEditApp
             self.root.withdraw()  # Hide main window
             edit_id = tk.Toplevel(self.root)
             edit_id.protocol("WM_DELETE_WINDOW", 
@@ -295,12 +366,19 @@ class MainApplication:
             messagebox.showerror("Error", f"Failed to open Edit Interface: {str(e)}")
             self.root.deiconify()
 
+    def open_diagnostics(self):
+        from diagnostics import DiagnosticsPanel
+        DiagnosticsPanel(self.root)
+
     def handle_child_window_close(self, window):
         window.destroy()
         self.root.deiconify()
 
     def quit_app(self):
         if messagebox.askokcancel("Exit", "Are you sure you want to exit?"):
+            if metrics.enabled():
+                metrics.log_summary()
+            close_connection()
             self.root.quit()
 
     def create_footer(self):
@@ -313,6 +391,13 @@ class MainApplication:
                                fg="#666666",
                                bg="#f0f2f5")
         version_label.pack(side="left")
+
+        self.status_label = tk.Label(footer_frame,
+                                     text="Checking database...",
+                                     font=("Helvetica", 10),
+                                     fg="#666666",
+                                     bg="#f0f2f5")
+        self.status_label.pack(side="left", padx=20)
         
         copyright_label = tk.Label(footer_frame,
                                  text="© 2024 Student ID Card Generator",
@@ -366,38 +451,48 @@ class MainApplication:
         frame.bind('<Leave>', on_leave)
 
     def check_database(self):
+        """Run the database checks on a worker thread so the menu stays responsive"""
+        def work():
+            error = check_database_schema()
+            self._startup_results.put(error)
+            if error is None:
+                preload_screens()
+                self._startup_results.put("preloaded")
+
+        threading.Thread(target=work, name="startup-check", daemon=True).start()
+        self.root.after(20, self.poll_startup)
+
+    def poll_startup(self):
         try:
-            conn = sqlite3.connect('sqlite.db')
-            # Could add connection pooling or connection management
-            cursor = conn.cursor()
-            
-            # Check if required table exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS id (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    standard TEXT,
-                    division TEXT,
-                    dob TEXT,
-                    rollno INTEGER,
-                    nm TEXT,
-                    yr TEXT,
-                    std_img TEXT,
-                    std_sign TEXT,
-                    p_sign TEXT
-                )
-            """)
-            
-            conn.commit()
-            conn.close()
-            return True
-        except Exception as e:
-            messagebox.showerror("Database Error", 
-                f"Failed to connect to database: {str(e)}")
-            return False
+            result = self._startup_results.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self.poll_startup)
+            return
+
+        if result == "preloaded":
+            self.timer.mark("screens preloaded")
+            logging.info(self.timer.report())
+            if self.startup_report:
+                print(self.timer.report())
+            return
+
+        if result is not None:
+            logging.error(result)
+            messagebox.showerror("Database Error", result)
+            self.root.quit()
+            return
+
+        self.timer.mark("database ready")
+
+        for button in self.menu_buttons:
+            button.configure(state="normal")
+        self.status_label.configure(text="")
+        # Keep polling for the preload to finish
+        self.root.after(20, self.poll_startup)
 
     def check_required_files(self):
         required_files = [
-            'logo_college.jpg',
+            get_registry().branding["logo"],
             'sqlite.db'
         ]
         
@@ -414,7 +509,30 @@ class MainApplication:
             return False
         return True
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ID card management system")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print startup timings once the menu is ready")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run the whole session under cProfile and tracemalloc")
+    parser.add_argument("--profile-op", choices=profiling.OPERATIONS,
+                        help="Profile only this operation, every time it runs")
+    parser.add_argument("--profile-top", type=int, default=25,
+                        help="Entries in the profile and allocation reports")
+    # Leave anything else (e.g. Tk options) alone
+    return parser.parse_known_args(argv)[0]
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile_op:
+        profiling.start_operation(args.profile_op, args.profile_top)
+    elif args.profile:
+        profiling.start_session(args.profile_top)
+
     root = tk.Tk()
-    app = MainApplication(root)
-    root.mainloop() 
\ No newline at end of file
+    app = MainApplication(root, startup_report=args.startup_report)
+    try:
+        root.mainloop()
+    finally:
+        for path in profiling.finish():
+            print(f"Profile written to {path}")
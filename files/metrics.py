@@ -0,0 +1,135 @@
+"""Lightweight timing spans aggregated into per-operation histograms.
+
+Disabled by default (set IDCARD_METRICS=1 or call enable()); while disabled
+span() hands back a shared no-op context manager and timed() adds a single
+flag check, so instrumented code pays next to nothing.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+
+# Samples kept per operation for percentiles; count and max cover every call
+MAX_SAMPLES = 2048
+
+_enabled = os.environ.get("IDCARD_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_histograms = {}
+
+
+class Histogram:
+    """Count, max and a bounded ring of recent durations for one operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds):
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            self.samples[self.count % MAX_SAMPLES] = seconds
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+        return {
+            "count": self.count,
+            "p50_ms": round(percentile(0.50), 3),
+            "p95_ms": round(percentile(0.95), 3),
+            "max_ms": round(self.max * 1000, 3),
+            "total_ms": round(self.total * 1000, 3),
+        }
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def record(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing the enclosed block under name"""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator timing every call of the function under name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """{operation: {count, p50_ms, p95_ms, max_ms, total_ms}} sorted by name"""
+    with _lock:
+        return {name: _histograms[name].summary() for name in sorted(_histograms)}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def log_summary(logger=logging):
+    """Write one line per operation to the application log"""
+    for name, stats in snapshot().items():
+        logger.info(f"metrics {name}: count={stats['count']} p50={stats['p50_ms']}ms "
+                    f"p95={stats['p95_ms']}ms max={stats['max_ms']}ms")
@@ -0,0 +1,192 @@
+"""Versioned schema migrations for sqlite.db, tracked with PRAGMA user_version"""
+import logging
+import sqlite3
+
+# Duplicates listed in the startup error; the rest are only logged
+MAX_LISTED_DUPLICATES = 10
+
+
+class DuplicateRollNumbers(Exception):
+    """Existing rows share a (yr, rollno), so the uniqueness constraint can't be applied"""
+
+    def __init__(self, duplicates):
+        self.duplicates = duplicates
+        listed = ", ".join(f"{yr} roll {rollno} ({count} rows)"
+                           for yr, rollno, count in duplicates[:MAX_LISTED_DUPLICATES])
+        if len(duplicates) > MAX_LISTED_DUPLICATES:
+            listed += f" and {len(duplicates) - MAX_LISTED_DUPLICATES} more"
+        super().__init__("Roll numbers must be unique per academic year, but these are "
+                         f"used more than once: {listed}. "
+                         "Correct or remove the duplicate rows, then start again.")
+
+
+def create_id_table(cursor):
+    """Student records"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS id (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            standard TEXT NOT NULL,
+            division TEXT NOT NULL,
+            dob TEXT NOT NULL,
+            rollno INTEGER NOT NULL,
+            nm TEXT NOT NULL,
+            yr TEXT NOT NULL,
+            std_img TEXT NOT NULL,
+            std_sign TEXT NOT NULL,
+            p_sign TEXT NOT NULL
+        )
+    """)
+
+
+def create_assets_table(cursor):
+    """Reference-counted image assets shared between rows"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS assets (
+            hash TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            path TEXT NOT NULL UNIQUE,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hash, kind)
+        )
+    """)
+
+
+def create_id_indexes(cursor):
+    """
+    Class-order index on the id table and the (yr, rollno) uniqueness constraint.
+    If existing rows already violate the constraint the migration fails with
+    the list of duplicates, which have to be cleaned up before startup.
+    """
+    # Serves year/standard/division filtered listings in class order
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_id_class
+        ON id (yr, standard, division, rollno)
+    """)
+
+    cursor.execute("""
+        SELECT yr, rollno, COUNT(*) FROM id
+        GROUP BY yr, rollno HAVING COUNT(*) > 1
+        ORDER BY yr, rollno
+    """)
+    duplicates = cursor.fetchall()
+    if duplicates:
+        for yr, rollno, count in duplicates:
+            logging.error(f"Duplicate roll number {rollno} for academic year {yr} ({count} rows)")
+        # Inserts rely on this index to reject duplicates, so never fall back to a plain one
+        raise DuplicateRollNumbers(duplicates)
+
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_id_yr_rollno ON id (yr, rollno)")
+
+
+def create_name_search_index(cursor):
+    """Case-insensitive name index so type-ahead LIKE 'prefix%' searches avoid a scan"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_id_nm_nocase ON id (nm COLLATE NOCASE)")
+
+
+def _create_fts_table(cursor, name, columns, options):
+    """External-content FTS5 table over id, kept in sync by triggers"""
+    column_list = ", ".join(columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5(
+            {column_list}, content='id', content_rowid='id', {options}
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON id BEGIN
+            INSERT INTO {name} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON id BEGIN
+            INSERT INTO {name} ({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {column_list} ON id BEGIN
+            INSERT INTO {name} ({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {name} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    # Index the rows that already exist
+    cursor.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+
+
+def create_search_index(cursor):
+    """
+    Full-text index over names, roll numbers, standards and divisions (id_fts),
+    plus a trigram index over names (id_trigram) for misspelled searches.
+    Builds without FTS5 skip this step; search then falls back to LIKE.
+    """
+    try:
+        _create_fts_table(cursor, "id_fts", ("nm", "rollno", "standard", "division"),
+                          "tokenize='unicode61 remove_diacritics 2', prefix='2 3'")
+    except sqlite3.OperationalError as e:
+        logging.warning(f"Full-text search unavailable ({e}); using LIKE search")
+        return
+
+    try:
+        _create_fts_table(cursor, "id_trigram", ("nm",), "tokenize='trigram'")
+    except sqlite3.OperationalError as e:
+        # The trigram tokenizer needs SQLite 3.34+
+        logging.warning(f"Trigram index unavailable ({e}); fuzzy name search disabled")
+
+
+def add_record_version(cursor):
+    """Row version for optimistic concurrency; every edit bumps it"""
+    cursor.execute("ALTER TABLE id ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+
+# Ordered list of migrations; migration N brings the schema to user_version N.
+# Never edit or reorder an entry once released - append a new one instead.
+MIGRATIONS = [
+    create_id_table,
+    create_assets_table,
+    create_id_indexes,
+    create_name_search_index,
+    create_search_index,
+    add_record_version,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def current_version(connection):
+    """Schema version recorded in the database"""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection):
+    """Apply pending migrations, each in its own transaction; returns the new version"""
+    version = current_version(connection)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    # Autocommit mode so BEGIN/COMMIT below are under our control
+    isolation_level = connection.isolation_level
+    connection.isolation_level = None
+    try:
+        while version < SCHEMA_VERSION:
+            cursor = connection.cursor()
+            # IMMEDIATE takes the write lock so two desks can't apply the same step
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                version = current_version(connection)
+                if version >= SCHEMA_VERSION:
+                    cursor.execute("COMMIT")
+                    break
+                step = MIGRATIONS[version]
+                step(cursor)
+                version += 1
+                cursor.execute(f"PRAGMA user_version = {version}")
+                cursor.execute("COMMIT")
+                logging.info(f"Applied schema migration {version}: {step.__name__}")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+    finally:
+        connection.isolation_level = isolation_level
+    return version
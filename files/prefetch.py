@@ -0,0 +1,69 @@
+"""Read-ahead of neighbouring records for sequential card browsing"""
+from collections import OrderedDict
+from card_view import IMAGE_SIZES
+import records
+
+MAX_CACHED_ROWS = 128
+
+
+class RecordPrefetcher:
+    """Keeps the next few records (and their decoded images) ready.
+
+    Every time a record is shown, the following ``ahead`` and preceding
+    ``behind`` records in class order are fetched with one indexed query
+    each, and their images are queued for decoding on the loader's worker
+    threads, so stepping to them needs neither a query nor a decode.
+    """
+
+    def __init__(self, connection, image_loader, ahead=3, behind=1):
+        self.connection = connection
+        self.image_loader = image_loader
+        self.ahead = ahead
+        self.behind = behind
+        self._rows = OrderedDict()
+        # id -> id of the neighbouring record (None at either end of the table)
+        self._links = {1: {}, -1: {}}
+
+    def _remember(self, row):
+        self._rows[row["id"]] = row
+        self._rows.move_to_end(row["id"])
+        while len(self._rows) > MAX_CACHED_ROWS:
+            self._rows.popitem(last=False)
+
+    def _warm_images(self, row):
+        for column, size in IMAGE_SIZES.items():
+            self.image_loader.prefetch(row[column], size)
+
+    def _read_ahead(self, record, step, count):
+        rows = records.neighbours(self.connection, record, step, count)
+        previous = record["id"]
+        for row in rows:
+            self._links[step][previous] = row["id"]
+            self._links[-step][row["id"]] = previous
+            self._remember(row)
+            self._warm_images(row)
+            previous = row["id"]
+        if len(rows) < count:
+            self._links[step][previous] = None
+
+    def warm(self, record):
+        """Prefetch around record; call after it has been displayed"""
+        self._remember(record)
+        if self.ahead:
+            self._read_ahead(record, 1, self.ahead)
+        if self.behind:
+            self._read_ahead(record, -1, self.behind)
+
+    def neighbour(self, record, step):
+        """Next (step=1) or previous (step=-1) record, or None at the end"""
+        links = self._links[step]
+        if record["id"] in links:
+            neighbour_id = links[record["id"]]
+            if neighbour_id is None:
+                return None
+            if neighbour_id in self._rows:
+                return self._rows[neighbour_id]
+            return records.get_record(self.connection, neighbour_id)
+
+        rows = records.neighbours(self.connection, record, step)
+        return rows[0] if rows else None
@@ -0,0 +1,357 @@
+"""Print-ready PDF sheets of CR80 ID cards"""
+import argparse
+import io
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import db
+from bulk_generate import build_query
+from card_renderer import CARD_SIZE, render_card
+
+MM_TO_PT = 72 / 25.4
+
+# Page sizes in millimetres
+PAGE_SIZES = {
+    "A4": (210.0, 297.0),
+    "Letter": (215.9, 279.4),
+}
+
+# ISO/IEC 7810 ID-1 (CR80) card size in millimetres
+CR80_MM = (85.6, 53.98)
+
+
+class SheetLayout:
+    """Grid of CR80 cards centred on a page, with cut lines in the margins"""
+
+    def __init__(self, page_size="A4", gap_mm=4.0, margin_mm=5.0):
+        self.page_mm = PAGE_SIZES[page_size]
+        self.gap_mm = gap_mm
+        card_w, card_h = CR80_MM
+        self.columns = max(1, int((self.page_mm[0] - 2 * margin_mm + gap_mm) // (card_w + gap_mm)))
+        self.rows = max(1, int((self.page_mm[1] - 2 * margin_mm + gap_mm) // (card_h + gap_mm)))
+        grid_w = self.columns * card_w + (self.columns - 1) * gap_mm
+        grid_h = self.rows * card_h + (self.rows - 1) * gap_mm
+        self.left_mm = (self.page_mm[0] - grid_w) / 2
+        self.top_mm = (self.page_mm[1] - grid_h) / 2
+
+    @property
+    def cards_per_page(self):
+        return self.columns * self.rows
+
+    @property
+    def page_size_pt(self):
+        return self.page_mm[0] * MM_TO_PT, self.page_mm[1] * MM_TO_PT
+
+    def card_box_pt(self, index):
+        """(x, y, width, height) in PDF points of the card slot, origin bottom-left"""
+        column = index % self.columns
+        row = index // self.columns
+        card_w, card_h = CR80_MM
+        x_mm = self.left_mm + column * (card_w + self.gap_mm)
+        top_mm = self.top_mm + row * (card_h + self.gap_mm)
+        y_mm = self.page_mm[1] - top_mm - card_h
+        return x_mm * MM_TO_PT, y_mm * MM_TO_PT, card_w * MM_TO_PT, card_h * MM_TO_PT
+
+    def crop_marks_pt(self):
+        """Cut-line marks in the page margins as ((x1, y1), (x2, y2)) segments"""
+        card_w, card_h = CR80_MM
+        page_w, page_h = self.page_mm
+        length = max(1.0, min(self.left_mm, self.top_mm) - 1.0)
+        marks = []
+        for column in range(self.columns):
+            for x in (self.left_mm + column * (card_w + self.gap_mm),
+                      self.left_mm + column * (card_w + self.gap_mm) + card_w):
+                marks.append(((x, page_h), (x, page_h - length)))
+                marks.append(((x, 0), (x, length)))
+        for row in range(self.rows):
+            for top in (self.top_mm + row * (card_h + self.gap_mm),
+                        self.top_mm + row * (card_h + self.gap_mm) + card_h):
+                y = page_h - top
+                marks.append(((0, y), (length, y)))
+                marks.append(((page_w, y), (page_w - length, y)))
+        return [((x1 * MM_TO_PT, y1 * MM_TO_PT), (x2 * MM_TO_PT, y2 * MM_TO_PT))
+                for (x1, y1), (x2, y2) in marks]
+
+
+class PdfSheetWriter:
+    """Minimal PDF writer that streams pages to disk as they are completed.
+
+    Each card is embedded as a JPEG image XObject and written as soon as it is
+    added, so memory use is bounded by a single card regardless of job size.
+    """
+
+    def __init__(self, path, page_size_pt):
+        self.file = open(path, "wb")
+        self.page_size_pt = page_size_pt
+        self.offsets = {}
+        self.page_ids = []
+        # Object 1 is the catalog and object 2 the page tree, both written on close
+        self.next_id = 3
+        self.page_images = []
+        self.page_content = []
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _reserve_id(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _write_object(self, object_id, body, stream=None):
+        self.offsets[object_id] = self.file.tell()
+        self.file.write(f"{object_id} 0 obj\n".encode())
+        self.file.write(body.encode())
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def add_image(self, jpeg_bytes, pixel_size, box):
+        """Place a JPEG-encoded image at (x, y, width, height) on the current page"""
+        image_id = self._reserve_id()
+        width, height = pixel_size
+        self._write_object(
+            image_id,
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+            f"/Length {len(jpeg_bytes)} >>",
+            jpeg_bytes)
+        name = f"Im{len(self.page_images)}"
+        self.page_images.append((name, image_id))
+        x, y, w, h = box
+        self.page_content.append(f"q {w:.3f} 0 0 {h:.3f} {x:.3f} {y:.3f} cm /{name} Do Q")
+
+    def add_lines(self, segments, width=0.25):
+        for (x1, y1), (x2, y2) in segments:
+            self.page_content.append(f"{width} w 0 G {x1:.3f} {y1:.3f} m {x2:.3f} {y2:.3f} l S")
+
+    def end_page(self):
+        """Finish the current page and write it out"""
+        content = "\n".join(self.page_content).encode()
+        content_id = self._reserve_id()
+        self._write_object(content_id, f"<< /Length {len(content)} >>", content)
+
+        resources = " ".join(f"/{name} {image_id} 0 R" for name, image_id in self.page_images)
+        page_id = self._reserve_id()
+        width, height = self.page_size_pt
+        self._write_object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.3f} {height:.3f}] "
+            f"/Resources << /XObject << {resources} >> >> /Contents {content_id} 0 R >>")
+        self.page_ids.append(page_id)
+        self.page_images = []
+        self.page_content = []
+
+    def close(self):
+        if self.page_content:
+            self.end_page()
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n".encode())
+        self.file.write(b"0000000000 65535 f \n")
+        for object_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[object_id]:010d} 00000 n \n".encode())
+        self.file.write(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\n"
+                        f"startxref\n{xref_offset}\n%%EOF\n".encode())
+        self.file.close()
+
+    def abort(self):
+        """Close the file without writing the trailer (after an error)"""
+        if not self.file.closed:
+            self.file.close()
+
+
+def encode_card(row, dpi, quality=90):
+    """Render a card at print resolution and return (jpeg_bytes, pixel_size)"""
+    width_px = round(CR80_MM[0] / 25.4 * dpi)
+    card = render_card(row, scale=width_px / CARD_SIZE[0])
+    buffer = io.BytesIO()
+    card.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue(), card.size
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: fall back to psutil when it is installed
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def render_stage(rows, dpi, workers=None, max_pending=16):
+    """Render and encode cards on a thread pool, yielding them in row order.
+
+    At most max_pending cards are in flight, so a slow writer throttles the
+    row iterator instead of letting rendered cards pile up in memory.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for row in rows:
+                pending.append(pool.submit(encode_card, row, dpi))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def tile_stage(cards, cards_per_page):
+    """Group encoded cards into sheets"""
+    page = []
+    for card in cards:
+        page.append(card)
+        if len(page) == cards_per_page:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+class PageWriterThread(threading.Thread):
+    """Final pipeline stage: writes finished sheets from a bounded queue"""
+
+    def __init__(self, writer, layout, crop_marks, max_pages):
+        super().__init__(daemon=True)
+        self.writer = writer
+        self.layout = layout
+        self.crop_marks = crop_marks
+        self.queue = queue.Queue(maxsize=max_pages)
+        self.error = None
+
+    def put(self, page):
+        """Hand a sheet to the writer, blocking while the queue is full"""
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self.queue.put(page, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def run(self):
+        try:
+            while True:
+                page = self.queue.get()
+                if page is None:
+                    break
+                for slot, (jpeg_bytes, pixel_size) in enumerate(page):
+                    self.writer.add_image(jpeg_bytes, pixel_size, self.layout.card_box_pt(slot))
+                if self.crop_marks:
+                    self.writer.add_lines(self.layout.crop_marks_pt())
+                self.writer.end_page()
+        except Exception as e:
+            self.error = e
+            # Keep draining so the producer is never left blocked on a full queue
+            while self.queue.get() is not None:
+                pass
+
+
+def export_pdf(rows, path, page_size="A4", dpi=300, crop_marks=True, progress=None,
+               workers=None, max_pending=16, max_queued_pages=2):
+    """Lay out cards for rows (any iterable) onto a multi-page PDF.
+
+    Rows flow through render -> tile -> write stages connected by bounded
+    buffers, so memory stays flat regardless of how many cards are exported.
+    The PDF is written to a .part file and only moved to path once every
+    card is in it, so a failed export never leaves a partial PDF behind.
+    """
+    layout = SheetLayout(page_size)
+    base, extension = os.path.splitext(path)
+    partial_path = f"{base}.part{extension}"
+    writer = PdfSheetWriter(partial_path, layout.page_size_pt)
+    writer_thread = PageWriterThread(writer, layout, crop_marks, max_queued_pages)
+    writer_thread.start()
+    start = time.perf_counter()
+    cards = 0
+    try:
+        try:
+            pages = tile_stage(render_stage(rows, dpi, workers, max_pending),
+                               layout.cards_per_page)
+            for page in pages:
+                writer_thread.put(page)
+                cards += len(page)
+                if progress:
+                    progress(cards)
+        finally:
+            writer_thread.queue.put(None)
+            writer_thread.join()
+        if writer_thread.error is not None:
+            raise writer_thread.error
+        writer.close()
+    except BaseException:
+        writer.abort()
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        raise
+    os.replace(partial_path, path)
+
+    return {
+        "cards": cards,
+        "pages": len(writer.page_ids),
+        "cards_per_page": layout.cards_per_page,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def iter_rows(connection, year=None, standard=None, division=None):
+    """Stream matching id rows from the database without loading them all"""
+    query, params = build_query(year, standard, division)
+    yield from connection.execute(query, params)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export ID cards as print-ready PDF sheets")
+    parser.add_argument("--db", default="sqlite.db", help="Path to the SQLite database")
+    parser.add_argument("--year", help="Academic year, e.g. 2023-24")
+    parser.add_argument("--standard", help="Standard, e.g. 'FY.BSC IT'")
+    parser.add_argument("--division", help="Division, e.g. A")
+    parser.add_argument("--out", default="cards.pdf", help="Output PDF file")
+    parser.add_argument("--page-size", choices=sorted(PAGE_SIZES), default="A4")
+    parser.add_argument("--dpi", type=int, default=300, help="Card raster resolution")
+    parser.add_argument("--no-crop-marks", action="store_true")
+    parser.add_argument("--workers", type=int, default=None, help="Render threads")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    connection = db.connect(args.db)
+    try:
+        rows = iter_rows(connection, args.year, args.standard, args.division)
+        summary = export_pdf(rows, args.out, page_size=args.page_size, dpi=args.dpi,
+                             crop_marks=not args.no_crop_marks, workers=args.workers,
+                             progress=lambda n: print(f"  {n} cards"))
+    finally:
+        connection.close()
+
+    print(f"Wrote {summary['cards']} cards on {summary['pages']} pages "
+          f"({summary['cards_per_page']} per page) to {args.out} in {summary['seconds']:.2f}s")
+    if summary["peak_rss_mb"] is not None:
+        print(f"Peak memory: {summary['peak_rss_mb']:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
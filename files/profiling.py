@@ -0,0 +1,209 @@
+"""Opt-in cProfile and tracemalloc profiling for the Tk application.
+
+Either the whole session is profiled (start_session) or only the calls of
+one named operation (start_operation), e.g. every "open_card". Work handed to
+worker threads through background() is profiled on those threads and merged
+in, so image decodes show up next to the Tk and SQLite time. Reports are
+written to logs/ by finish(): a .pstats file for pstats/snakeviz, a text
+summary of the slowest functions and a top-N allocation report.
+"""
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+LOG_DIR = "logs"
+TRACEBACK_FRAMES = 10
+
+# Operations that can be profiled on their own (see operation())
+OPERATIONS = ("open_card", "preview", "save")
+
+_profiler = None
+
+# Keep the profiler's own bookkeeping out of the allocation report
+_EXCLUDE = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__))
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_EXCLUDE)
+
+
+class Profiler:
+    def __init__(self, target=None, top=25, log_dir=LOG_DIR):
+        self.target = target
+        self.top = top
+        self.log_dir = log_dir
+        self.calls = 0
+        self.profile = cProfile.Profile()
+        # cProfile only sees the thread that enabled it; one more per worker thread
+        self.worker_profiles = {}
+        self._lock = threading.Lock()
+        # Allocation growth per source line, summed over profiled operations
+        self.allocations = Counter()
+        self.allocation_counts = Counter()
+        self._active = False
+        self._start_snapshot = None
+
+    def start_session(self):
+        tracemalloc.start(TRACEBACK_FRAMES)
+        self.profile.enable()
+
+    def begin(self):
+        if self._active:
+            # Nested call of the same operation; the outer one covers it
+            return False
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Python 3.12+: another profiler is running (e.g. a worker's); skip this call
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+        self._start_snapshot = _snapshot()
+        self._active = True
+        self.calls += 1
+        return True
+
+    def end(self):
+        self.profile.disable()
+        snapshot = _snapshot()
+        for stat in snapshot.compare_to(self._start_snapshot, "lineno"):
+            key = str(stat.traceback[0])
+            self.allocations[key] += stat.size_diff
+            self.allocation_counts[key] += stat.count_diff
+        self._start_snapshot = None
+        self._active = False
+
+    def recording(self):
+        return self.target is None or self._active
+
+    def _worker_profile(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            profile = self.worker_profiles.get(thread_id)
+            if profile is None:
+                profile = self.worker_profiles[thread_id] = cProfile.Profile()
+            return profile
+
+    def run_in_worker(self, func, *args, **kwargs):
+        profile = self._worker_profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from one profiler at a time;
+            # the main profile is running and already covers this thread
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+
+    def _session_allocations(self):
+        snapshot = _snapshot()
+        for stat in snapshot.statistics("lineno"):
+            key = str(stat.traceback[0])
+            self.allocations[key] += stat.size
+            self.allocation_counts[key] += stat.count
+
+    def finish(self):
+        """Stop profiling and write the reports; returns the written paths"""
+        self.profile.disable()
+        if self.target is None and tracemalloc.is_tracing():
+            self._session_allocations()
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        tracemalloc.stop()
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        label = self.target or "session"
+        base = os.path.join(self.log_dir, f"profile_{label}_{time.strftime('%Y%m%d_%H%M%S')}")
+
+        paths = [base + ".pstats", base + "_top.txt", base + "_alloc.txt"]
+        summary = io.StringIO()
+        stats = pstats.Stats(stream=summary)
+        with self._lock:
+            worker_profiles = list(self.worker_profiles.values())
+        for profile in [self.profile] + worker_profiles:
+            # Stats refuses profiles that recorded nothing (e.g. an unused operation)
+            profile.create_stats()
+            if profile.stats:
+                stats.add(profile)
+        stats.dump_stats(paths[0])
+
+        if self.target:
+            summary.write(f"Operation '{self.target}' profiled over {self.calls} calls\n")
+        summary.write(f"Main thread plus {len(worker_profiles)} worker threads\n\n")
+        stats.sort_stats("cumulative").print_stats(self.top)
+        stats.sort_stats("tottime").print_stats(self.top)
+        with open(paths[1], "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+
+        with open(paths[2], "w", encoding="utf-8") as f:
+            kind = "growth during operations" if self.target else "live at exit"
+            f.write(f"Top {self.top} allocation sites ({kind}); peak traced {peak / 1024:.1f} KiB\n\n")
+            for key, size in self.allocations.most_common(self.top):
+                f.write(f"{size / 1024:10.1f} KiB {self.allocation_counts[key]:8d} blocks  {key}\n")
+
+        for path in paths:
+            logging.info(f"Profile report written to {path}")
+        return paths
+
+
+def start_session(top=25):
+    """Profile everything from now until finish()"""
+    global _profiler
+    _profiler = Profiler(top=top)
+    _profiler.start_session()
+    return _profiler
+
+
+def start_operation(name, top=25):
+    """Profile only calls wrapped in operation(name) until finish()"""
+    global _profiler
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+    _profiler = Profiler(target=name, top=top)
+    return _profiler
+
+
+def finish():
+    global _profiler
+    if _profiler is None:
+        return []
+    profiler, _profiler = _profiler, None
+    return profiler.finish()
+
+
+def background(func):
+    """func, profiled on whichever worker thread runs it.
+
+    Call on the submitting thread: work handed off during a profiled
+    operation (or at any time in a session) is charged to the profile even
+    though it runs after the operation has returned.
+    """
+    profiler = _profiler
+    if profiler is None or not profiler.recording():
+        return func
+    return functools.partial(profiler.run_in_worker, func)
+
+
+def operation(name):
+    """Decorator marking a user-level operation that can be profiled by name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None or profiler.target != name or not profiler.begin():
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.end()
+        return wrapper
+    return decorator
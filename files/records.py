@@ -0,0 +1,185 @@
+"""Queries over the id table shared by the View and Edit screens"""
+import re
+from difflib import SequenceMatcher
+import metrics
+
+SEARCH_COLUMNS = ("id", "nm", "rollno", "standard", "division", "yr")
+FILTER_COLUMNS = ("yr", "standard", "division")
+
+# bm25 weights for the id_fts columns (nm, rollno, standard, division)
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+# Minimum per-word similarity for a trigram candidate to count as a misspelling
+FUZZY_CUTOFF = 0.7
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filter_clause(filters):
+    conditions = []
+    params = []
+    for column in FILTER_COLUMNS:
+        value = filters.get(column)
+        if value:
+            conditions.append(f"id.{column}=?")
+            params.append(value)
+    return conditions, params
+
+
+def has_table(connection, name):
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name=?", (name,)).fetchone() is not None
+
+
+def _fts_query(text):
+    """FTS5 query matching every token; words match as prefixes, numbers exactly"""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text):
+        terms.append(f'"{token}"' if token.isdigit() else f'"{token}"*')
+    return " ".join(terms)
+
+
+def _trigram_query(words):
+    """FTS5 query matching any trigram of the given words"""
+    trigrams = {word[i:i + 3] for word in words for i in range(len(word) - 2)}
+    return " OR ".join(f'"{trigram}"' for trigram in sorted(trigrams))
+
+
+def _similarity(words, name):
+    """How well every search word matches some word of name (0..1)"""
+    name_words = name.lower().split()
+    if not name_words:
+        return 0.0
+
+    def score(word):
+        return max(1.0 if name_word.startswith(word)
+                   else SequenceMatcher(None, word, name_word).ratio()
+                   for name_word in name_words)
+    return min(score(word) for word in words)
+
+
+def _select(connection, source, conditions, params, order, limit, exclude=()):
+    conditions = list(conditions)
+    params = list(params)
+    if exclude:
+        conditions.append(f"id.id NOT IN ({','.join('?' * len(exclude))})")
+        params.extend(exclude)
+    columns = ", ".join(f"id.{column}" for column in SEARCH_COLUMNS)
+    query = f"SELECT {columns} FROM {source}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order} LIMIT ?"
+    params.append(limit)
+    return connection.execute(query, params).fetchall()
+
+
+def ranked_search(connection, text, limit=50, **filters):
+    """Full-text search over name tokens, roll number, standard and division.
+
+    Results are ranked with bm25, name matches weighted highest. When nothing
+    matches, names within FUZZY_CUTOFF of the (misspelled) words are looked up
+    in the trigram index instead. Returns None if the FTS tables don't exist.
+    """
+    if not has_table(connection, "id_fts"):
+        return None
+    query = _fts_query(text)
+    if not query:
+        return []
+
+    conditions, params = _filter_clause(filters)
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    results = _select(connection, "id_fts JOIN id ON id.id = id_fts.rowid",
+                      ["id_fts MATCH ?"] + conditions, [query] + params,
+                      f"bm25(id_fts, {weights})", limit)
+
+    words = [token.lower() for token in TOKEN_PATTERN.findall(text)
+             if not token.isdigit() and len(token) >= 3]
+    if not results and words and has_table(connection, "id_trigram"):
+        # Over-fetch trigram candidates, then keep only the close matches
+        candidates = _select(connection, "id_trigram JOIN id ON id.id = id_trigram.rowid",
+                             ["id_trigram MATCH ?"] + conditions,
+                             [_trigram_query(words)] + params,
+                             "bm25(id_trigram)", limit * 4)
+        scored = [(_similarity(words, row[1]), row) for row in candidates]
+        scored = [item for item in scored if item[0] >= FUZZY_CUTOFF]
+        scored.sort(key=lambda item: -item[0])
+        results = [row for _, row in scored[:limit]]
+    return results
+
+
+@metrics.timed("db.search")
+def search_students(connection, text="", limit=50, **filters):
+    """Find students by name, roll number, standard or division.
+
+    Uses the ranked full-text index when available. Otherwise names that start
+    with text come first (via the NOCASE name index) and substring matches fill
+    whatever is left of the limit. Returns rows of SEARCH_COLUMNS.
+    """
+    text = text.strip()
+    conditions, params = _filter_clause(filters)
+
+    def run(extra_condition=None, extra_params=(), exclude=(), remaining=limit):
+        where = list(conditions)
+        values = list(params)
+        if extra_condition:
+            where.append(extra_condition)
+            values.extend(extra_params)
+        return _select(connection, "id", where, values, "id.nm COLLATE NOCASE",
+                       remaining, exclude)
+
+    if not text:
+        return run()
+
+    results = ranked_search(connection, text, limit, **filters)
+    if results is not None:
+        return results
+
+    if text.isdigit():
+        return run("rollno=?", (int(text),))
+
+    pattern = _like_escape(text)
+    results = run("nm LIKE ? ESCAPE '\\'", (pattern + "%",))
+    if len(results) < limit:
+        found = [row[0] for row in results]
+        results += run("nm LIKE ? ESCAPE '\\'", ("%" + pattern + "%",),
+                       exclude=found, remaining=limit - len(results))
+    return results
+
+
+def distinct_values(connection, column):
+    """Distinct values of a filter column, for populating dropdowns"""
+    if column not in FILTER_COLUMNS:
+        raise ValueError(f"Unsupported filter column: {column}")
+    query = f"SELECT DISTINCT {column} FROM id ORDER BY {column}"
+    return [row[0] for row in connection.execute(query)]
+
+
+def has_records(connection):
+    return connection.execute("SELECT 1 FROM id LIMIT 1").fetchone() is not None
+
+
+@metrics.timed("db.get_record")
+def get_record(connection, record_id):
+    """Fetch a full id row by primary key (None if it no longer exists)"""
+    return connection.execute("SELECT * FROM id WHERE id=?", (record_id,)).fetchone()
+
+
+# Browsing order for next/previous navigation; served by idx_id_class
+CLASS_ORDER = ("yr", "standard", "division", "rollno", "id")
+
+
+@metrics.timed("db.neighbours")
+def neighbours(connection, record, step=1, count=1):
+    """The count records after (step > 0) or before record in class order"""
+    operator, direction = (">", "ASC") if step > 0 else ("<", "DESC")
+    columns = ", ".join(CLASS_ORDER)
+    order = ", ".join(f"{column} {direction}" for column in CLASS_ORDER)
+    query = f"""
+        SELECT * FROM id WHERE ({columns}) {operator} ({', '.join('?' * len(CLASS_ORDER))})
+        ORDER BY {order} LIMIT ?
+    """
+    values = [record[column] for column in CLASS_ORDER]
+    return connection.execute(query, values + [count]).fetchall()
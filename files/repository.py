@@ -0,0 +1,82 @@
+"""Writes to the id table shared by the entry form, the editor and the importer.
+
+Inserts rely on the unique (yr, rollno) index instead of a SELECT first, so a
+save is one statement and two desks cannot both take the same roll number.
+Updates are optimistic: each row carries a version that every edit bumps, and
+an update only applies if the row still has the version the editor read.
+Neither function commits; the caller owns the transaction.
+"""
+import sqlite3
+
+import metrics
+
+RECORD_COLUMNS = ("standard", "division", "dob", "rollno", "nm", "yr",
+                  "std_img", "std_sign", "p_sign")
+
+INSERT_SQL = f"""
+    INSERT INTO id ({", ".join(RECORD_COLUMNS)})
+    VALUES ({", ".join("?" for _ in RECORD_COLUMNS)})
+"""
+
+# The only uniqueness constraint a new row can hit is (yr, rollno)
+INSERT_NEW_SQL = INSERT_SQL + " ON CONFLICT DO NOTHING"
+
+UPDATE_SQL = f"""
+    UPDATE id
+    SET {", ".join(f"{column}=?" for column in RECORD_COLUMNS)}, version=version + 1
+    WHERE id=? AND version=?
+"""
+
+
+class DuplicateRollNumber(Exception):
+    """Another student already has this roll number in the academic year"""
+
+    def __init__(self, rollno, yr):
+        super().__init__(f"Roll number {rollno} already exists for academic year {yr}")
+        self.rollno = rollno
+        self.yr = yr
+
+
+class StaleRecord(Exception):
+    """The row was changed or deleted at another desk after it was read"""
+
+    def __init__(self, record_id):
+        super().__init__(f"Record {record_id} was changed by someone else")
+        self.record_id = record_id
+
+
+def record_params(values, image_paths):
+    """Parameters for INSERT_SQL/UPDATE_SQL from validated values and image paths"""
+    return (values["standard"], values["division"], values["dob"], values["rollno"],
+            values["nm"], values["yr"], image_paths[0], image_paths[1], image_paths[2])
+
+
+@metrics.timed("db.insert")
+def insert_student(cursor, values, image_paths):
+    """Insert a student; returns the new id or raises DuplicateRollNumber"""
+    cursor.execute(INSERT_NEW_SQL, record_params(values, image_paths))
+    if cursor.rowcount == 0:
+        raise DuplicateRollNumber(values["rollno"], values["yr"])
+    return cursor.lastrowid
+
+
+@metrics.timed("db.update")
+def update_student(cursor, record_id, version, values, image_paths):
+    """Update a student read at version; returns the new version.
+
+    Raises StaleRecord if another desk saved or deleted the row in the
+    meantime, and DuplicateRollNumber if the new roll number is taken.
+    """
+    try:
+        cursor.execute(UPDATE_SQL, record_params(values, image_paths) + (record_id, version))
+    except sqlite3.IntegrityError:
+        # Only a (yr, rollno) clash is ours to explain; anything else propagates
+        taken = cursor.execute("SELECT 1 FROM id WHERE yr=? AND rollno=? AND id<>?",
+                               (values["yr"], values["rollno"], record_id)).fetchone()
+        if taken is None:
+            raise
+        raise DuplicateRollNumber(values["rollno"], values["yr"]) from None
+    if cursor.rowcount == 0:
+        # The row was saved at another desk or deleted since it was read
+        raise StaleRecord(record_id)
+    return version + 1
@@ -1,29 +1,13 @@
 import sqlite3
 import os
+from migrations import migrate
 from PIL import Image, ImageDraw, ImageFont
 
 def create_database():
     """Create the SQLite database and initialize it with required tables"""
     try:
         conn = sqlite3.connect('sqlite.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS id (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                standard TEXT NOT NULL,
-                division TEXT NOT NULL,
-                dob TEXT NOT NULL,
-                rollno INTEGER NOT NULL,
-                nm TEXT NOT NULL,
-                yr TEXT NOT NULL,
-                std_img TEXT NOT NULL,
-                std_sign TEXT NOT NULL,
-                p_sign TEXT NOT NULL
-            )
-        """)
-        
-        conn.commit()
+        migrate(conn)
         conn.close()
         print("Database created successfully!")
         return True
@@ -0,0 +1,157 @@
+import tkinter as tk
+from tkinter import ttk
+from common_styles import COLORS, STYLES
+import records
+import metrics
+
+ALL_OPTION = "All"
+
+
+class StudentPicker(tk.Frame):
+    """Type-ahead student search that identifies the chosen record by id.
+
+    Results are queried incrementally (debounced, LIMITed) instead of loading
+    every name up front, so opening a screen costs the same at any table size.
+    """
+
+    def __init__(self, parent, connection, command=None, limit=50, delay_ms=250, **kwargs):
+        super().__init__(parent, bg=COLORS["light"], **kwargs)
+        self.connection = connection
+        self.command = command
+        self.limit = limit
+        self.delay_ms = delay_ms
+        self.result_ids = []
+        self._pending = None
+
+        self.create_filters()
+        self.create_search_box()
+        self.create_results_list()
+
+        self.refresh()
+
+    def create_filters(self):
+        filter_frame = tk.Frame(self, bg=COLORS["light"])
+        filter_frame.pack(fill="x", pady=(0, 10))
+
+        self.filters = {}
+        for column, label_text in (("yr", "Academic Year"), ("standard", "Standard"),
+                                   ("division", "Division")):
+            tk.Label(filter_frame,
+                    text=f"{label_text}:",
+                    **STYLES["label"]).pack(side="left", padx=(0, 5))
+
+            combo = ttk.Combobox(filter_frame,
+                                 values=[ALL_OPTION],
+                                 font=STYLES["entry"]["font"],
+                                 width=12,
+                                 state="readonly")
+            combo.set(ALL_OPTION)
+            # Options are loaded when the dropdown is first opened
+            combo.configure(postcommand=lambda c=combo, col=column: self.load_filter_values(c, col))
+            combo.bind('<<ComboboxSelected>>', lambda e: self.refresh())
+            combo.pack(side="left", padx=(0, 15))
+            self.filters[column] = combo
+
+    def create_search_box(self):
+        search_frame = tk.Frame(self, bg=COLORS["light"])
+        search_frame.pack(fill="x")
+
+        tk.Label(search_frame,
+                text="Search Student:",
+                **STYLES["label"]).pack(side="left", padx=(0, 10))
+
+        self.search_text = tk.StringVar()
+        self.search_text.trace_add("write", lambda *args: self.schedule_refresh())
+        self.search_entry = tk.Entry(search_frame,
+                                     textvariable=self.search_text,
+                                     width=32,
+                                     **STYLES["entry"])
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_entry.bind('<Down>', lambda e: self.focus_results())
+        self.search_entry.bind('<Return>', lambda e: self.choose())
+
+    def create_results_list(self):
+        list_frame = tk.Frame(self, bg=COLORS["light"])
+        list_frame.pack(fill="both", expand=True, pady=(10, 0))
+
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side="right", fill="y")
+
+        self.results = tk.Listbox(list_frame,
+                                  height=8,
+                                  font=STYLES["entry"]["font"],
+                                  bg=COLORS["hover_light"],
+                                  relief="solid",
+                                  borderwidth=1,
+                                  activestyle="none",
+                                  exportselection=False,
+                                  yscrollcommand=scrollbar.set)
+        self.results.pack(side="left", fill="both", expand=True)
+        scrollbar.config(command=self.results.yview)
+
+        self.results.bind('<Double-Button-1>', lambda e: self.choose())
+        self.results.bind('<Return>', lambda e: self.choose())
+
+        self.status_label = tk.Label(self,
+                                     text="",
+                                     font=("Helvetica", 10),
+                                     fg=COLORS["text_gray"],
+                                     bg=COLORS["light"])
+        self.status_label.pack(anchor="w")
+
+    def load_filter_values(self, combo, column):
+        try:
+            combo.configure(values=[ALL_OPTION] + records.distinct_values(self.connection, column))
+        except Exception as e:
+            print(f"Error loading {column} values: {e}")
+
+    def get_filters(self):
+        return {column: combo.get() for column, combo in self.filters.items()
+                if combo.get() != ALL_OPTION}
+
+    def schedule_refresh(self):
+        """Debounce typing so only the last keystroke in a burst hits the database"""
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(self.delay_ms, self.refresh)
+
+    @metrics.timed("ui.picker_refresh")
+    def refresh(self):
+        self._pending = None
+        try:
+            rows = records.search_students(self.connection, self.search_text.get(),
+                                           limit=self.limit, **self.get_filters())
+        except Exception as e:
+            print(f"Error searching students: {e}")
+            rows = []
+
+        self.results.delete(0, "end")
+        self.result_ids = []
+        for record_id, name, rollno, standard, division, yr in rows:
+            self.results.insert("end", f"{name}  -  {standard} {division}, Roll {rollno} ({yr})")
+            self.result_ids.append(record_id)
+
+        if not rows:
+            self.status_label.config(text="No matching students")
+        elif len(rows) >= self.limit:
+            self.status_label.config(text=f"Showing first {self.limit} matches - type to narrow down")
+        else:
+            self.status_label.config(text=f"{len(rows)} matches")
+        if rows:
+            self.results.selection_set(0)
+
+    def focus_results(self):
+        if self.result_ids:
+            self.results.focus_set()
+            self.results.activate(0)
+
+    def get_selected_id(self):
+        """Primary key of the highlighted student, or None"""
+        selection = self.results.curselection()
+        if not selection:
+            return None
+        return self.result_ids[selection[0]]
+
+    def choose(self):
+        if self.command and self.get_selected_id() is not None:
+            self.command()
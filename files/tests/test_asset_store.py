@@ -0,0 +1,40 @@
+import os
+import sqlite3
+
+import pytest
+from PIL import Image
+
+import asset_store
+import migrations
+from asset_ingest import asset_paths
+
+
+@pytest.fixture
+def connection(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Image.new("RGB", (40, 40), (9, 80, 200)).save("upload.png")
+    connection = sqlite3.connect("test.db")
+    migrations.migrate(connection)
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize("variant", [0, 1])
+def test_acquire_rewrites_a_single_missing_variant(connection, variant):
+    prepared = asset_store.prepare("upload.png", "photo")
+    paths = asset_paths("photo", prepared[3])
+    os.remove(paths[variant])
+    asset_store.acquire_prepared(connection.cursor(), prepared)
+    assert all(os.path.exists(path) for path in paths)
+
+
+def test_discard_keeps_referenced_files(connection):
+    kept = asset_store.prepare("upload.png", "photo")
+    asset_store.acquire_prepared(connection.cursor(), kept)
+    connection.commit()
+    Image.new("RGB", (40, 40), (200, 80, 9)).save("other.png")
+    dropped = asset_store.prepare("other.png", "photo")
+
+    asset_store.discard(connection, [kept, dropped])
+    assert all(os.path.exists(path) for path in asset_paths("photo", kept[3]))
+    assert not any(os.path.exists(path) for path in asset_paths("photo", dropped[3]))
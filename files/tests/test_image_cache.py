@@ -0,0 +1,33 @@
+from PIL import Image
+from asset_ingest import ingest_image
+from image_cache import load_thumbnail
+
+
+def transparent_signature(path):
+    """Black stroke on a fully transparent background"""
+    image = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+    for x in range(20, 180):
+        image.putpixel((x, 50), (0, 0, 0, 255))
+    image.save(path)
+    return path
+
+
+def test_transparent_png_is_flattened_onto_white(tmp_path):
+    image = load_thumbnail(transparent_signature(tmp_path / "sign.png"), (100, 50))
+    assert image.mode == "RGB"
+    assert image.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_transparent_palette_png_is_flattened_onto_white(tmp_path):
+    path = tmp_path / "sign_p.png"
+    Image.open(transparent_signature(tmp_path / "sign.png")).convert("P").save(
+        path, transparency=0)
+    image = load_thumbnail(path, (100, 50))
+    assert image.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_ingested_transparent_signature_keeps_white_background(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    card_path, _ = ingest_image(str(transparent_signature(tmp_path / "sign.png")), "sign")
+    with Image.open(card_path) as stored:
+        assert stored.convert("RGB").getpixel((0, 0)) == (255, 255, 255)
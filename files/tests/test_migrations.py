@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+import migrations
+
+LEGACY_ROW = ("FY", "A", "2005-01-03", 1, "Asha Rao", "2023-24", "p.jpg", "s.png", "ps.png")
+
+
+def legacy_database(path, rows):
+    """An id table as created before versioned migrations (user_version 0)"""
+    connection = sqlite3.connect(path)
+    migrations.create_id_table(connection.cursor())
+    connection.executemany("""
+        INSERT INTO id (standard, division, dob, rollno, nm, yr, std_img, std_sign, p_sign)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    connection.commit()
+    return connection
+
+
+def index_names(connection):
+    return {row[1]: row[2] for row in connection.execute("PRAGMA index_list(id)")}
+
+
+def test_fresh_database_reaches_the_current_version(tmp_path):
+    connection = sqlite3.connect(tmp_path / "new.db")
+    assert migrations.migrate(connection) == migrations.SCHEMA_VERSION
+    assert migrations.current_version(connection) == migrations.SCHEMA_VERSION
+    indexes = index_names(connection)
+    assert indexes["idx_id_yr_rollno"] == 1
+    assert {"idx_id_class", "idx_id_nm_nocase"} <= set(indexes)
+    assert "idx_id_nm" not in indexes
+
+
+def test_migrate_is_idempotent(tmp_path):
+    connection = sqlite3.connect(tmp_path / "new.db")
+    migrations.migrate(connection)
+    assert migrations.migrate(connection) == migrations.SCHEMA_VERSION
+
+
+def test_legacy_rows_are_kept_and_versioned(tmp_path):
+    connection = legacy_database(tmp_path / "old.db", [LEGACY_ROW])
+    migrations.migrate(connection)
+    assert connection.execute("SELECT nm, rollno, version FROM id").fetchall() == [
+        ("Asha Rao", 1, 0)]
+
+
+def test_duplicate_roll_numbers_stop_the_migration(tmp_path):
+    duplicate = LEGACY_ROW[:4] + ("Ravi Patil",) + LEGACY_ROW[5:]
+    connection = legacy_database(tmp_path / "old.db", [LEGACY_ROW, duplicate])
+    with pytest.raises(migrations.DuplicateRollNumbers) as raised:
+        migrations.migrate(connection)
+    assert raised.value.duplicates == [("2023-24", 1, 2)]
+    # The failing step is rolled back; the ones before it stay applied
+    assert migrations.current_version(connection) == migrations.MIGRATIONS.index(
+        migrations.create_id_indexes)
+    assert "idx_id_class" not in index_names(connection)
@@ -0,0 +1,65 @@
+import io
+import re
+
+import pytest
+from PIL import Image
+
+import print_export
+
+ROW = {"id": 1, "nm": "Asha Rao", "standard": "FY", "division": "A", "dob": "2005-01-03",
+       "rollno": 1, "yr": "2023-24", "std_img": "photo.jpg", "std_sign": "sign.png",
+       "p_sign": "principal.png"}
+
+
+def jpeg(size=(8, 5)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def check_structure(data):
+    """Header, trailer and every xref offset pointing at its object"""
+    assert data.startswith(b"%PDF-1.4\n")
+    assert data.endswith(b"%%EOF\n")
+    xref_offset = int(re.search(rb"startxref\n(\d+)\n", data).group(1))
+    assert data[xref_offset:].startswith(b"xref\n")
+    entries = re.findall(rb"(\d{10}) 00000 n \n", data[xref_offset:])
+    for object_id, offset in enumerate(entries, start=1):
+        assert data[int(offset):].startswith(f"{object_id} 0 obj\n".encode())
+
+
+def test_sheet_writer_streams_pages(tmp_path):
+    path = tmp_path / "sheet.pdf"
+    writer = print_export.PdfSheetWriter(path, (595.0, 842.0))
+    image = jpeg()
+    writer.add_image(image, (8, 5), (10, 20, 80, 50))
+    writer.add_lines([((0, 0), (5, 5))])
+    writer.end_page()
+    writer.add_image(image, (8, 5), (10, 20, 80, 50))
+    writer.close()
+
+    data = path.read_bytes()
+    check_structure(data)
+    assert b"/Type /Pages /Kids [" in data and b"/Count 2" in data
+    assert data.count(image) == 2
+
+
+def test_export_pdf_fills_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    summary = print_export.export_pdf([ROW] * 11, "cards.pdf", dpi=50)
+    assert summary["cards"] == 11
+    assert summary["pages"] == 2
+    check_structure((tmp_path / "cards.pdf").read_bytes())
+    assert not (tmp_path / "cards.part.pdf").exists()
+
+
+def test_failed_export_leaves_no_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def rows():
+        yield ROW
+        raise RuntimeError("database went away")
+
+    with pytest.raises(RuntimeError):
+        print_export.export_pdf(rows(), "cards.pdf", dpi=50)
+    assert list(tmp_path.iterdir()) == []
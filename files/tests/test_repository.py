@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+import migrations
+import repository
+
+IMAGES = ("photo.jpg", "sign.png", "principal.png")
+
+
+def student(**changes):
+    values = {"standard": "FY", "division": "A", "dob": "2005-01-03",
+              "rollno": 1, "nm": "Asha Rao", "yr": "2023-24"}
+    values.update(changes)
+    return values
+
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = sqlite3.connect(tmp_path / "test.db")
+    migrations.migrate(connection)
+    yield connection
+    connection.close()
+
+
+def test_insert_and_update_bump_the_version(connection):
+    cursor = connection.cursor()
+    record_id = repository.insert_student(cursor, student(), IMAGES)
+    assert repository.update_student(cursor, record_id, 0, student(nm="Asha R"), IMAGES) == 1
+    connection.commit()
+    assert cursor.execute("SELECT nm, version FROM id").fetchall() == [("Asha R", 1)]
+
+
+def test_duplicate_roll_number_is_rejected_on_insert(connection):
+    cursor = connection.cursor()
+    repository.insert_student(cursor, student(), IMAGES)
+    with pytest.raises(repository.DuplicateRollNumber):
+        repository.insert_student(cursor, student(nm="Ravi Patil"), IMAGES)
+    # Same roll number in another academic year is fine
+    repository.insert_student(cursor, student(yr="2024-25"), IMAGES)
+
+
+def test_duplicate_roll_number_is_rejected_on_update(connection):
+    cursor = connection.cursor()
+    repository.insert_student(cursor, student(), IMAGES)
+    other = repository.insert_student(cursor, student(rollno=2), IMAGES)
+    with pytest.raises(repository.DuplicateRollNumber):
+        repository.update_student(cursor, other, 0, student(rollno=1), IMAGES)
+
+
+def test_update_of_a_changed_record_is_stale(connection):
+    cursor = connection.cursor()
+    record_id = repository.insert_student(cursor, student(), IMAGES)
+    repository.update_student(cursor, record_id, 0, student(nm="Asha R"), IMAGES)
+    with pytest.raises(repository.StaleRecord):
+        repository.update_student(cursor, record_id, 0, student(nm="Asha Rao"), IMAGES)
+
+
+def test_update_of_a_deleted_record_is_stale(connection):
+    cursor = connection.cursor()
+    record_id = repository.insert_student(cursor, student(), IMAGES)
+    cursor.execute("DELETE FROM id WHERE id=?", (record_id,))
+    with pytest.raises(repository.StaleRecord):
+        repository.update_student(cursor, record_id, 0, student(), IMAGES)
+
+
+def test_other_integrity_errors_are_not_reported_as_duplicates(connection):
+    cursor = connection.cursor()
+    record_id = repository.insert_student(cursor, student(), IMAGES)
+    with pytest.raises(sqlite3.IntegrityError):
+        repository.update_student(cursor, record_id, 0, student(nm=None), IMAGES)
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+import validation
+
+VALID = {
+    "nm": "Asha Rao",
+    "standard": "FY",
+    "division": "A",
+    "yr": "2023-24",
+    "dob": "2005-01-03",
+    "rollno": "12",
+}
+
+
+def test_valid_record_has_no_errors_and_integer_rollno():
+    values, errors = validation.validate_record(VALID)
+    assert errors == []
+    assert values["rollno"] == 12
+
+
+def test_spreadsheet_float_rollno_is_accepted():
+    values, errors = validation.validate_record(dict(VALID, rollno="12.0"))
+    assert errors == []
+    assert values["rollno"] == 12
+
+
+def test_zero_rollno_is_out_of_range_not_empty():
+    _, errors = validation.validate_record(dict(VALID, rollno=0))
+    assert errors == [("rollno", "Roll number must be between 1 and 60")]
+
+
+def test_missing_fields_only_report_empty():
+    _, errors = validation.validate_record(dict(VALID, nm="  ", rollno=None))
+    assert errors == [("nm", validation.EMPTY), ("rollno", validation.EMPTY)]
+    assert validation.describe(errors) == "Following fields are empty: Name, Roll Number"
+
+
+def test_field_rules():
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    cases = [
+        ({"nm": "Asha 2"}, ("nm", "Name should contain only letters and spaces")),
+        ({"dob": "03-01-2005"}, ("dob", "Date must be in YYYY-MM-DD format")),
+        ({"dob": "2005-02-30"}, ("dob", "2005-02-30 is not a valid date")),
+        ({"dob": tomorrow}, ("dob", "Date of birth cannot be in the future")),
+        ({"rollno": "twelve"}, ("rollno", "Roll number must be numeric")),
+        ({"rollno": "61"}, ("rollno", "Roll number must be between 1 and 60")),
+    ]
+    for change, error in cases:
+        assert validation.validate_record(dict(VALID, **change))[1] == [error]
+
+
+def test_batch_errors_are_indexed_in_record_order():
+    records = [dict(VALID, rollno="99"), VALID, dict(VALID, nm="", dob="bad"),
+               dict(VALID, nm="X1", dob="bad")]
+    values, errors = validation.validate_batch(records)
+    assert len(values) == 4
+    # Rows with an empty field only get the "is empty" errors
+    assert errors == [
+        (0, "rollno", "Roll number must be between 1 and 60"),
+        (2, "nm", validation.EMPTY),
+        (3, "nm", "Name should contain only letters and spaces"),
+        (3, "dob", "Date must be in YYYY-MM-DD format"),
+    ]
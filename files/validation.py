@@ -0,0 +1,127 @@
+"""Field rules shared by the entry form, the editor and the bulk importer.
+
+validate_record() checks one record and validate_batch() checks many; both
+return the cleaned values plus a list of (field, message) errors, so callers
+decide whether to show a dialog or write an error report.
+"""
+import re
+from datetime import date
+from functools import lru_cache
+
+REQUIRED_FIELDS = ("nm", "standard", "division", "yr", "dob", "rollno")
+FIELD_LABELS = {
+    "nm": "Name",
+    "standard": "Standard",
+    "division": "Division",
+    "yr": "Academic Year",
+    "dob": "Date of Birth",
+    "rollno": "Roll Number",
+}
+MIN_ROLLNO = 1
+MAX_ROLLNO = 60
+
+EMPTY = "is empty"
+
+# Letters (any script) separated by spaces
+NAME_PATTERN = re.compile(r"[^\W\d_]+(?:\s+[^\W\d_]+)*")
+DOB_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+# Spreadsheets often hand back "12.0" for numeric cells
+ROLLNO_PATTERN = re.compile(r"(\d+)(?:\.0*)?")
+
+
+@lru_cache(maxsize=8192)
+def parse_dob(text):
+    """YYYY-MM-DD to a date; None if malformed or not a real calendar date"""
+    match = DOB_PATTERN.fullmatch(text)
+    if match is None:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def _dob_error(text, today):
+    born = parse_dob(text)
+    if born is None:
+        if DOB_PATTERN.fullmatch(text) is None:
+            return "Date must be in YYYY-MM-DD format"
+        return f"{text} is not a valid date"
+    if born > today:
+        return "Date of birth cannot be in the future"
+    return None
+
+
+def _rollno(text):
+    """(int or None, error or None)"""
+    match = ROLLNO_PATTERN.fullmatch(text)
+    if match is None:
+        return None, "Roll number must be numeric"
+    rollno = int(match.group(1))
+    if not MIN_ROLLNO <= rollno <= MAX_ROLLNO:
+        return rollno, f"Roll number must be between {MIN_ROLLNO} and {MAX_ROLLNO}"
+    return rollno, None
+
+
+def validate_record(record):
+    """Returns (values, errors); values has rollno as int when it is numeric"""
+    values, errors = validate_batch([record])
+    return values[0], [(field, message) for _, field, message in errors]
+
+
+def validate_batch(records):
+    """Validate many records at once; returns (values, errors).
+
+    values[i] belongs to records[i]; errors is a list of (i, field, message)
+    in record order. Rules run column by column and each distinct date or
+    roll number string is checked once, which keeps a 10k-row intake in the
+    low milliseconds. Rows with empty fields get only the "is empty" errors.
+    """
+    # Only a missing value is empty; a numeric 0 from a spreadsheet is a value
+    columns = {field: ["" if record.get(field) is None else str(record.get(field)).strip()
+                       for record in records]
+               for field in REQUIRED_FIELDS}
+    errors = []
+    empty = set()
+    for field, column in columns.items():
+        for index, value in enumerate(column):
+            if not value:
+                errors.append((index, field, EMPTY))
+                empty.add(index)
+
+    match_name = NAME_PATTERN.fullmatch
+    for index, name in enumerate(columns["nm"]):
+        if match_name(name) is None and index not in empty:
+            errors.append((index, "nm", "Name should contain only letters and spaces"))
+
+    today = date.today()
+    dob_errors = {}
+    for index, dob in enumerate(columns["dob"]):
+        if dob not in dob_errors:
+            dob_errors[dob] = _dob_error(dob, today)
+        if dob_errors[dob] and index not in empty:
+            errors.append((index, "dob", dob_errors[dob]))
+
+    rollnos = {}
+    parsed = columns["rollno"]
+    for index, text in enumerate(parsed):
+        if text not in rollnos:
+            rollnos[text] = _rollno(text)
+        rollno, message = rollnos[text]
+        if rollno is not None:
+            parsed[index] = rollno
+        if message and index not in empty:
+            errors.append((index, "rollno", message))
+
+    # Stable sort: per record, errors stay in field order
+    errors.sort(key=lambda error: error[0])
+    values = [dict(zip(REQUIRED_FIELDS, row)) for row in zip(*columns.values())]
+    return values, errors
+
+
+def describe(errors):
+    """One message for a dialog from (field, message) errors"""
+    empty = [FIELD_LABELS[field] for field, message in errors if message == EMPTY]
+    if empty:
+        return f'Following fields are empty: {", ".join(empty)}'
+    return "\n".join(message for _, message in errors)
@@ -1,9 +1,21 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
+from tkinter import messagebox, filedialog
 import sqlite3
 import os
+import queue
+import threading
 from common_styles import COLORS, STYLES
+from image_loader import AsyncImageLoader
+from db import close_connection, get_connection
+from print_export import export_pdf, iter_rows
+from student_picker import StudentPicker
+from prefetch import RecordPrefetcher
+from card_view import CardView
+import metrics
+import profiling
+import records
+
+EXPORT_POLL_MS = 50
 
 class CardDisplayApp:
     def __init__(self, root, parent=None):
@@ -13,13 +25,9 @@ class CardDisplayApp:
         self.root.attributes('-fullscreen', True)
         self.root.configure(bg=COLORS["light"])
 
-        # Initialize variables
-        self.selected_name = None
-        self.names = []
-
         # Connect to SQLite database
         try:
-            self.connection = sqlite3.connect('sqlite.db')
+            self.connection = get_connection()
             self.cursor = self.connection.cursor()
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", 
@@ -27,6 +35,16 @@ class CardDisplayApp:
             root.destroy()
             return
 
+        # Decodes card images off the Tk thread
+        self.image_loader = AsyncImageLoader(self.root)
+        self.prefetcher = RecordPrefetcher(self.connection, self.image_loader)
+        # Closing the window goes back the same way, stopping the loader
+        self.root.protocol("WM_DELETE_WINDOW", self.go_back)
+        self.card_window = None
+        self.card_view = None
+        self.current_data = None
+        self.export_thread = None
+
         # Create main container
         self.main_container = tk.Frame(self.root, bg=COLORS["light"])
         self.main_container.pack(expand=True, fill="both", padx=40, pady=20)
@@ -73,6 +91,7 @@ class CardDisplayApp:
         exit_btn.pack(side="left", padx=5)
 
     def go_back(self):
+        self.image_loader.shutdown()
         self.root.destroy()
         if self.parent:
             self.parent.deiconify()
@@ -94,27 +113,13 @@ class CardDisplayApp:
         search_frame.grid(row=1, column=0, sticky="ew", pady=20)
         
         # Center the search components
-        search_frame.grid_columnconfigure(1, weight=1)
+        search_frame.grid_columnconfigure(0, weight=1)
         
-        # Name dropdown with label
-        name_label = tk.Label(search_frame,
-                             text="Select Student:",
-                             **STYLES["label"])
-        name_label.grid(row=0, column=0, padx=(0, 10))
-
-        # Get names from database first
-        self.names = self.get_names_from_database()
-        
-        # Initialize StringVar for selected name
-        self.selected_name = tk.StringVar()
-
-        # Enhanced combobox
-        self.name_dropdown = ttk.Combobox(search_frame,
-                                        textvariable=self.selected_name,
-                                        values=self.names,
-                                        font=STYLES["entry"]["font"],
-                                        width=30)
-        self.name_dropdown.grid(row=0, column=1, sticky="ew", padx=10)
+        # Type-ahead student search
+        self.picker = StudentPicker(search_frame,
+                                    self.connection,
+                                    command=self.display_card)
+        self.picker.grid(row=0, column=0, sticky="ew", padx=(0, 10))
 
         # View button
         view_button = tk.Button(search_frame,
@@ -123,10 +128,10 @@ class CardDisplayApp:
                                bg=COLORS["primary"],
                                fg=COLORS["light"],
                                **STYLES["button"])
-        view_button.grid(row=0, column=2, padx=10)
+        view_button.grid(row=0, column=1, padx=10, sticky="n")
 
         # Add a message if no records found
-        if not self.names:
+        if not records.has_records(self.connection):
             message_label = tk.Label(container,
                                    text="No student records found",
                                    font=("Helvetica", 12),
@@ -134,192 +139,196 @@ class CardDisplayApp:
                                    bg=COLORS["light"])
             message_label.grid(row=2, column=0, pady=20)
 
-    def get_names_from_database(self):
-        try:
-            self.cursor.execute("SELECT nm FROM id ORDER BY nm")
-            return [row[0] for row in self.cursor.fetchall()]
-        except Exception as e:
-            messagebox.showerror("Database Error", 
-                f"Failed to fetch names: {str(e)}")
-            return []
-
     def display_card(self):
         try:
-            # Get selected name
-            selected_name = self.selected_name.get()
-            if not selected_name:
+            # Get selected student
+            record_id = self.picker.get_selected_id()
+            if record_id is None:
                 messagebox.showerror("Error", "Please select a student")
                 return
 
             # Get student data
-            self.cursor.execute("""
-                SELECT * FROM id WHERE nm=?
-            """, (selected_name,))
-            data = self.cursor.fetchone()
+            data = records.get_record(self.connection, record_id)
             if not data:
                 messagebox.showerror("Error", "Student data not found")
                 return
 
-            # Create a new window
-            card_window = tk.Toplevel(self.root)
-            card_window.title("ID Card View")
-            
-            # Configure window
-            window_width = 900
-            window_height = 600
-            screen_width = card_window.winfo_screenwidth()
-            screen_height = card_window.winfo_screenheight()
-            x = (screen_width - window_width) // 2
-            y = (screen_height - window_height) // 2
-            card_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
-            card_window.configure(bg="#ffffff")
-
-            # Main container with card-like appearance
-            container = tk.Frame(card_window, bg="#ffffff", padx=40, pady=30)
-            container.pack(expand=True, fill="both")
-
-            # Card frame with border and shadow effect
-            card_frame = tk.Frame(container,
-                                bg="#ffffff",
-                                relief="solid",
-                                bd=1)
-            card_frame.pack(expand=True, fill="both")
-
-            # Header with college name
-            header_frame = tk.Frame(card_frame, bg="#1a237e", height=60)
-            header_frame.pack(fill="x")
-            header_frame.pack_propagate(False)
-
-            tk.Label(header_frame,
-                    text="COLLEGE NAME",
-                    font=("Arial", 24, "bold"),
-                    fg="#ffffff",
-                    bg="#1a237e").pack(expand=True)
-
-            # Student information section
-            info_frame = tk.Frame(card_frame, bg="#ffffff", padx=30, pady=20)
-            info_frame.pack(fill="x")
-
-            # Two columns for information
-            left_frame = tk.Frame(info_frame, bg="#ffffff")
-            left_frame.pack(side="left", expand=True, fill="both")
-
-            right_frame = tk.Frame(info_frame, bg="#ffffff")
-            right_frame.pack(side="right", expand=True, fill="both")
-
-            # Student photo
-            try:
-                photo = Image.open(data[7])  # std_img
-                photo = photo.resize((150, 150))
-                photo_image = ImageTk.PhotoImage(photo)
-                photo_label = tk.Label(right_frame, image=photo_image, bg="#ffffff")
-                photo_label.image = photo_image
-                photo_label.pack(pady=(0, 20))
-            except Exception as e:
-                print(f"Error loading student photo: {e}")
-
-            # Student information (left side)
-            info_fields = [
-                ("Name", data[5]),  # nm
-                ("Standard", data[1]),  # standard
-                ("Division", data[2]),  # division
-                ("Roll No", str(data[4])),  # rollno
-                ("Academic Year", data[6]),  # yr
-                ("Date of Birth", data[3])  # dob
-            ]
-
-            for label, value in info_fields:
-                field_frame = tk.Frame(left_frame, bg="#ffffff")
-                field_frame.pack(fill="x", pady=5)
-
-                tk.Label(field_frame,
-                        text=f"{label}:",
-                        font=("Arial", 12, "bold"),
-                        bg="#ffffff").pack(side="left", padx=(0, 10))
-
-                tk.Label(field_frame,
-                        text=value,
-                        font=("Arial", 12),
-                        bg="#ffffff").pack(side="left")
-
-            # Signature section
-            signature_frame = tk.Frame(card_frame, bg="#ffffff", padx=30, pady=20)
-            signature_frame.pack(fill="x", side="bottom")
-
-            # Student signature
-            try:
-                student_sign = Image.open(data[8])  # std_sign
-                student_sign = student_sign.resize((100, 50))
-                student_sign_photo = ImageTk.PhotoImage(student_sign)
-                
-                sign_frame = tk.Frame(signature_frame, bg="#ffffff")
-                sign_frame.pack(side="left", expand=True)
-                
-                tk.Label(sign_frame,
-                        image=student_sign_photo,
-                        bg="#ffffff").pack()
-                sign_frame.image = student_sign_photo
-                
-                tk.Label(sign_frame,
-                        text="Student's Signature",
-                        font=("Arial", 10),
-                        bg="#ffffff").pack()
-            except Exception as e:
-                print(f"Error loading student signature: {e}")
+            self.show_record(data)
 
-            # Principal signature
-            try:
-                principal_sign = Image.open(data[9])  # p_sign
-                principal_sign = principal_sign.resize((100, 50))
-                principal_sign_photo = ImageTk.PhotoImage(principal_sign)
-                
-                sign_frame = tk.Frame(signature_frame, bg="#ffffff")
-                sign_frame.pack(side="right", expand=True)
-                
-                tk.Label(sign_frame,
-                        image=principal_sign_photo,
-                        bg="#ffffff").pack()
-                sign_frame.image = principal_sign_photo
-                
-                tk.Label(sign_frame,
-                        text="Principal's Signature",
-                        font=("Arial", 10),
-                        bg="#ffffff").pack()
-            except Exception as e:
-                print(f"Error loading principal signature: {e}")
+        except Exception as e:
+            print(f"Error displaying card: {e}")
+            messagebox.showerror("Error", f"Error displaying card: {str(e)}")
 
-            # Buttons frame
-            button_frame = tk.Frame(container, bg="#ffffff")
-            button_frame.pack(pady=(20, 0))
+    def show_neighbour(self, data, step):
+        """Step to the next/previous student in class order"""
+        try:
+            neighbour = self.prefetcher.neighbour(data, step)
+            if neighbour is None:
+                self.card_window.bell()
+                return
+            self.show_record(neighbour)
+        except Exception as e:
+            print(f"Error displaying card: {e}")
+            messagebox.showerror("Error", f"Error displaying card: {str(e)}")
 
-            tk.Button(button_frame,
-                     text="Print ID Card",
-                     command=lambda: self.print_card(card_frame),
-                     bg=COLORS["success"],
-                     fg="#ffffff",
-                     font=("Arial", 11),
-                     padx=20,
-                     pady=8,
-                     relief="flat").pack(side="left", padx=10)
+    def create_card_window(self):
+        card_window = tk.Toplevel(self.root)
+        card_window.title("ID Card View")
+        
+        # Configure window
+        window_width = 900
+        window_height = 640
+        screen_width = card_window.winfo_screenwidth()
+        screen_height = card_window.winfo_screenheight()
+        x = (screen_width - window_width) // 2
+        y = (screen_height - window_height) // 2
+        card_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        card_window.configure(bg="#ffffff")
+        return card_window
+
+    @profiling.operation("open_card")
+    @metrics.timed("ui.show_record")
+    def show_record(self, data):
+        """Show data in the card window, creating the window on first use"""
+        try:
+            if self.card_window is None or not self.card_window.winfo_exists():
+                self.build_card_window()
+
+            self.current_data = data
+            self.card_view.show(data)
+            self.card_window.deiconify()
+            self.card_window.lift()
+            self.card_window.focus_set()
+
+            # Read ahead once the card has been drawn
+            self.card_window.after_idle(lambda: self.prefetcher.warm(data))
+
+        except Exception as e:
+            print(f"Error displaying card: {e}")
+            messagebox.showerror("Error", f"Error displaying card: {str(e)}")
+
+    @metrics.timed("ui.build_card_window")
+    def build_card_window(self):
+        """Build the card window once; show_record only updates its contents"""
+        card_window = self.card_window = self.create_card_window()
+        # Hide rather than destroy, so the widgets are reused for the next card
+        card_window.protocol("WM_DELETE_WINDOW", card_window.withdraw)
 
+        # Arrow keys browse through the class
+        card_window.bind('<Left>', lambda e: self.show_neighbour(self.current_data, -1))
+        card_window.bind('<Right>', lambda e: self.show_neighbour(self.current_data, 1))
+
+        # Main container with card-like appearance
+        container = tk.Frame(card_window, bg="#ffffff", padx=40, pady=30)
+        container.pack(expand=True, fill="both")
+
+        # Card frame with border and shadow effect
+        self.card_view = CardView(container, self.image_loader)
+        self.card_view.pack(expand=True, fill="both")
+
+        # Buttons frame
+        button_frame = tk.Frame(container, bg="#ffffff")
+        button_frame.pack(pady=(20, 0))
+
+        buttons = [
+            ("< Previous", lambda: self.show_neighbour(self.current_data, -1), COLORS["dark"]),
+            ("Print ID Card", lambda: self.print_card(self.current_data), COLORS["success"]),
+            ("Print Whole Class", lambda: self.print_class(self.current_data), COLORS["primary"]),
+            ("Close", card_window.withdraw, COLORS["danger"]),
+            ("Next >", lambda: self.show_neighbour(self.current_data, 1), COLORS["dark"]),
+        ]
+        for text, command, color in buttons:
             tk.Button(button_frame,
-                     text="Close",
-                     command=card_window.destroy,
-                     bg=COLORS["danger"],
+                     text=text,
+                     command=command,
+                     bg=color,
                      fg="#ffffff",
                      font=("Arial", 11),
                      padx=20,
                      pady=8,
                      relief="flat").pack(side="left", padx=10)
 
-        except Exception as e:
-            print(f"Error displaying card: {e}")
-            messagebox.showerror("Error", f"Error displaying card: {str(e)}")
+        # Progress of a print export running in the background
+        self.export_status = tk.Label(container,
+                                      text="",
+                                      font=("Helvetica", 10),
+                                      fg=COLORS["text_gray"],
+                                      bg="#ffffff")
+        self.export_status.pack(pady=(10, 0))
+
+    def ask_pdf_path(self, default_name):
+        return filedialog.asksaveasfilename(
+            title="Save Print Sheet",
+            defaultextension=".pdf",
+            initialfile=default_name,
+            filetypes=[("PDF files", "*.pdf")]
+        )
+
+    def print_card(self, data):
+        """Export the displayed card as a print-ready PDF sheet"""
+        path = self.ask_pdf_path(f"id_card_{data['rollno']}_{data['nm']}.pdf")
+        if not path:
+            return
+        self.export_in_background(
+            lambda: [data], path, "card",
+            lambda summary: messagebox.showinfo("Print", f"Print sheet saved to {path}"))
+
+    def print_class(self, data):
+        """Export every card in the displayed student's class as PDF sheets"""
+        year, standard, division = data["yr"], data["standard"], data["division"]
+        path = self.ask_pdf_path(f"id_cards_{year}_{standard}_{division}.pdf".replace(" ", "_"))
+        if not path:
+            return
+        self.export_in_background(
+            # Runs on the worker, which needs its own connection
+            lambda: iter_rows(get_connection(), year, standard, division), path, "class",
+            lambda summary: messagebox.showinfo("Print",
+                f"{summary['cards']} cards on {summary['pages']} pages saved to {path}"))
+
+    def export_in_background(self, rows, path, what, on_done):
+        """Run export_pdf(rows(), path) on a worker thread so the window stays responsive.
+
+        Progress and the outcome come back through a queue polled with after(),
+        since Tk may only be touched from the mainloop thread.
+        """
+        if self.export_thread is not None and self.export_thread.is_alive():
+            messagebox.showinfo("Print", "Please wait for the current export to finish")
+            return
+        results = queue.Queue()
 
-    def print_card(self, card_frame):
-        # Add printing functionality here
-        messagebox.showinfo("Print", "Printing functionality to be implemented")
+        def work():
+            try:
+                summary = export_pdf(rows(), path,
+                                     progress=lambda cards: results.put(("progress", cards)))
+                results.put(("done", summary))
+            except Exception as e:
+                results.put(("error", e))
+            finally:
+                close_connection()
 
-    def __del__(self):
-        if hasattr(self, 'connection'):
-            self.connection.close() 
\ No newline at end of file
+        def poll():
+            try:
+                while True:
+                    try:
+                        kind, value = results.get_nowait()
+                    except queue.Empty:
+                        self.root.after(EXPORT_POLL_MS, poll)
+                        return
+                    if kind == "progress":
+                        self.export_status.configure(text=f"Exporting... {value} cards done")
+                        continue
+                    self.export_status.configure(text="")
+                    if kind == "done":
+                        on_done(value)
+                    else:
+                        print(f"Error exporting {what}: {value}")
+                        messagebox.showerror("Error", f"Error exporting {what}: {str(value)}")
+                    return
+            except tk.TclError:
+                # Window closed mid-export; the worker finishes on its own
+                pass
+
+        self.export_status.configure(text="Exporting...")
+        self.export_thread = threading.Thread(target=work, name="pdf-export", daemon=True)
+        self.export_thread.start()
+        self.root.after(EXPORT_POLL_MS, poll) 
\ No newline at end of file